@@ -5,14 +5,18 @@ This module contains ONLY route declarations and request/response handling.
 All business logic is delegated to service modules and workers.
 """
 
+import hashlib
 import os
-import uuid
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.core.config import get_settings
 from app.core.exceptions import (
@@ -22,7 +26,7 @@ from app.core.exceptions import (
     TTSError,
 )
 from app.core.logging import get_logger
-from app.db.models import Call, Segment, Transcript
+from app.db.models import Call, Segment, new_call_id
 from app.db.session import get_db
 from app.schemas.models import (
     CallDetail,
@@ -35,16 +39,47 @@ from app.schemas.models import (
     SpeakRequest,
     TranscribeResponse,
 )
-from app.services.coachable_service import get_coachable_service
-from app.services.sentiment_service import get_sentiment_service
-from app.services.stt_service import get_stt_service
+from app.services.cache_service import get_cache_service
 from app.services.tts_service import get_tts_service
-from app.workers.tasks import process_transcription
+from app.workers.celery_app import PROCESS_TRANSCRIPTION_TASK, celery_app
 
 logger = get_logger(__name__)
 router = APIRouter()
 settings = get_settings()
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Content types accepted by /transcribe without a warning
+_ALLOWED_AUDIO_CT = frozenset({
+    "audio/wav", "audio/x-wav", "audio/wave",
+    "audio/mpeg", "audio/mp3",
+    "application/octet-stream",
+})
+
+# Synthesized audio file suffix -> response media type
+_SUFFIX_MEDIA = {".mp3": "audio/mpeg", ".wav": "audio/wav", ".ogg": "audio/ogg"}
+
+# Validates a whole list of ORM segments in one pydantic-core call
+_segment_list_adapter = TypeAdapter(list[SegmentResponse])
+
+
+def _audio_file_response(audio_path: str, media_type: str) -> FileResponse:
+    """
+    Build a FileResponse for a synthesized audio file.
+
+    Passing a pre-computed stat_result lets Starlette skip its own threaded
+    os.stat() and hand the path straight to the server, which uses the
+    zero-copy ``http.response.pathsend`` extension when it supports it.
+    """
+    stat_result = os.stat(audio_path)
+    return FileResponse(
+        path=audio_path,
+        media_type=media_type,
+        stat_result=stat_result,
+        filename=os.path.basename(audio_path),
+        content_disposition_type="inline",
+    )
+
 
 # ── GET /calls ────────────────────────────────────────────────────────────
 
@@ -54,10 +89,10 @@ settings = get_settings()
     summary="List recent calls",
     description="Fetch a list of recent calls for the dashboard.",
 )
-async def list_calls(limit: int = 20, db: Session = Depends(get_db)):
+async def list_calls(limit: int = 20, db: AsyncSession = Depends(get_db)):
     """List recent calls."""
-    calls = db.query(Call).order_by(Call.created_at.desc()).limit(limit).all()
-    return calls
+    result = await db.scalars(select(Call).order_by(Call.created_at.desc()).limit(limit))
+    return result.all()
 
 
 @router.get(
@@ -66,15 +101,48 @@ async def list_calls(limit: int = 20, db: Session = Depends(get_db)):
     summary="Get call details",
     description="Fetch full transcript and analysis for a specific call.",
 )
-async def get_call_detail(call_id: str, db: Session = Depends(get_db)):
-    """Get detailed analysis for a call."""
-    call = db.query(Call).filter(Call.call_id == call_id).first()
+async def get_call_detail(call_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Get detailed analysis for a call.
+
+    Completed calls never change, so their serialized payload is cached in
+    Redis and every response carries an ETag; a matching If-None-Match
+    gets an empty 304 instead of the body.
+    """
+    cache = get_cache_service()
+    cache_key = f"call:v1:{call_id}"
+
+    # The Redis client is blocking; keep it off the event loop
+    payload = await run_in_threadpool(cache.get, cache_key)
+    if payload is None:
+        detail = await _load_call_detail(call_id, db)
+        payload = detail.model_dump_json()
+        if detail.status == "completed":
+            await run_in_threadpool(cache.set, cache_key, payload, ttl=settings.CALL_DETAIL_CACHE_TTL_SECONDS)
+
+    etag = f'"{hashlib.md5(payload.encode()).hexdigest()}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag})
+
+
+async def _load_call_detail(call_id: str, db: AsyncSession) -> CallDetail:
+    """Load a call with its transcript and segments from the database."""
+    # Eager-load the transcript (joined) and segments (ordered by start_time
+    # via the relationship) instead of issuing a query per table.
+    stmt = (
+        select(Call)
+        .options(joinedload(Call.transcript), selectinload(Call.segments))
+        .where(Call.call_id == call_id)
+    )
+    call = (await db.execute(stmt)).scalar_one_or_none()
     if not call:
         raise HTTPException(status_code=404, detail=f"Call not found: {call_id}")
-    
-    transcript = db.query(Transcript).filter(Transcript.call_id == call_id).first()
-    segments = db.query(Segment).filter(Segment.call_id == call_id).order_by(Segment.start_time).all()
-    
+
+    transcript = call.transcript
+    segments = call.segments
+
     return CallDetail(
         call_id=call.call_id,
         status=call.status,
@@ -82,50 +150,58 @@ async def get_call_detail(call_id: str, db: Session = Depends(get_db)):
         customer_id=call.customer_id,
         created_at=call.created_at,
         transcript=transcript.full_text if transcript else None,
-        segments=segments,
+        segments=_segment_list_adapter.validate_python(segments),
     )
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an If-None-Match header value matches the given ETag."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 # ── POST /transcribe ─────────────────────────────────────────────────────
 
 @router.post(
     "/transcribe",
-    # ... previous transcribe endpoint remains basically same ...
     response_model=TranscribeResponse,
+    status_code=202,
     summary="Transcribe a sales-call audio clip",
+    description=(
+        "Upload an audio clip and queue it for transcription, sentiment and "
+        "coachable-moment analysis. Poll GET /calls/{call_id} for the result."
+    ),
 )
 async def transcribe(
     audio: UploadFile = File(..., description="Audio file (WAV or MP3)"),
     call_id: str = Form(default=None, description="Unique call identifier"),
     agent_id: str = Form(default="System", description="Sales agent identifier"),
     customer_id: str = Form(default="Customer", description="Customer identifier"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Transcribe audio with diarization, sentiment, and coachable detection."""
+    """Store the upload and queue diarized transcription, sentiment, and coachable detection."""
 
-    if audio.content_type and audio.content_type not in (
-        "audio/wav", "audio/x-wav", "audio/mpeg", "audio/mp3",
-        "application/octet-stream", "audio/wave",
-    ):
+    if audio.content_type and audio.content_type not in _ALLOWED_AUDIO_CT:
         logger.warning(f"Likely unsupported format: {audio.content_type}")
 
     if not call_id:
-        call_id = str(uuid.uuid4())
+        call_id = new_call_id()
 
     suffix = Path(audio.filename).suffix if audio.filename else ".wav"
     upload_path = settings.upload_path / f"{call_id}{suffix}"
 
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
     try:
-        content = await audio.read()
-        max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
-        if len(content) > max_bytes:
-            raise HTTPException(status_code=413, detail="File too large")
-
-        with open(upload_path, "wb") as f:
-            f.write(content)
-
-        logger.info(f"Audio uploaded: {upload_path} ({len(content)} bytes)")
+        # The whole copy runs in one worker thread so neither the reads nor
+        # the disk writes block the event loop.
+        written = await run_in_threadpool(_save_upload, audio.file, upload_path, max_bytes)
+        logger.info(f"Audio uploaded: {upload_path} ({written} bytes)")
+    except HTTPException:
+        raise
     except Exception as e:
+        upload_path.unlink(missing_ok=True)
         logger.error(f"File upload failed: {e}")
         raise HTTPException(status_code=500, detail="File upload failed")
 
@@ -134,54 +210,65 @@ async def transcribe(
         agent_id=agent_id,
         customer_id=customer_id,
         audio_filename=str(upload_path),
-        status="pending",
+        status="queued",
     )
     db.add(call)
-    db.commit()
+    await db.commit()
 
     try:
-        stt = get_stt_service()
-        sentiment = get_sentiment_service() if settings.SENTIMENT_ENABLED else None
-        coachable = get_coachable_service()
-
-        result = process_transcription(
-            call_id=call_id,
-            audio_path=str(upload_path),
-            db=db,
-            stt_service=stt,
-            sentiment_service=sentiment,
-            coachable_service=coachable,
-            sentiment_enabled=settings.SENTIMENT_ENABLED,
+        # Publishing to the broker is a blocking network call
+        await run_in_threadpool(
+            celery_app.send_task,
+            PROCESS_TRANSCRIPTION_TASK,
+            kwargs={"call_id": call_id, "audio_path": str(upload_path)},
         )
+    except Exception as e:
+        logger.error(f"[{call_id}] Failed to enqueue transcription: {e}", exc_info=True)
+        call.status = "failed"
+        await db.commit()
+        raise HTTPException(status_code=503, detail="Transcription queue unavailable")
 
-        segments_db = db.query(Segment).filter(Segment.call_id == call_id).order_by(Segment.start_time).all()
+    logger.info(f"[{call_id}] Transcription queued")
+    return TranscribeResponse(call_id=call_id, status="queued", transcript="", segments=[])
 
-        return TranscribeResponse(
-            call_id=call_id,
-            status="completed",
-            transcript=result.full_text,
-            segments=[SegmentResponse.from_orm(s) for s in segments_db],
-            duration_seconds=result.duration_seconds,
-            language=result.language,
-        )
 
-    except Exception as e:
-        logger.error(f"Processing failed: {e}", exc_info=True)
-        call.status = "failed"
-        db.commit()
-        raise HTTPException(status_code=500, detail=str(e))
+def _save_upload(src: BinaryIO, dest: Path, max_bytes: int) -> int:
+    """
+    Copy an uploaded file to disk in fixed-size chunks.
+
+    Memory stays O(chunk) and oversized files are rejected as soon as the
+    limit is crossed.
+
+    Returns:
+        Number of bytes written.
+
+    Raises:
+        HTTPException: 413 if the upload exceeds max_bytes.
+    """
+    written = 0
+    with open(dest, "wb") as f:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > max_bytes:
+                break
+            f.write(chunk)
+
+    if written > max_bytes:
+        dest.unlink(missing_ok=True)
+        raise HTTPException(status_code=413, detail="File too large")
+    return written
 
 
 # ── POST /speak ──────────────────────────────────────────────────────────
 
 @router.post("/speak", summary="Synthesize text to speech")
-async def speak(request: SpeakRequest):
+def speak(request: SpeakRequest):
     """Generate audio from text using TTS."""
     try:
         tts = get_tts_service()
-        audio_path = tts.synthesize(text=request.text, language=request.language)
-        media_type = "audio/mpeg" if audio_path.endswith(".mp3") else "audio/wav"
-        return FileResponse(path=audio_path, media_type=media_type)
+        audio_path = tts.synthesize_cached(text=request.text, language=request.language)
+        media_type = _SUFFIX_MEDIA.get(Path(audio_path).suffix, "audio/mpeg")
+        return _audio_file_response(audio_path, media_type)
     except Exception as e:
         logger.error(f"TTS failed: {e}")
         raise HTTPException(status_code=500, detail="TTS failed")
@@ -190,18 +277,28 @@ async def speak(request: SpeakRequest):
 # ── POST /replay ─────────────────────────────────────────────────────────
 
 @router.post("/replay", summary="Replay coachable moments from a call")
-async def replay(request: ReplayRequest, db: Session = Depends(get_db)):
+async def replay(request: ReplayRequest, db: AsyncSession = Depends(get_db)):
     """Generate TTS replay of coachable moments for a call."""
-    call = db.query(Call).filter(Call.call_id == request.call_id).first()
+    call = await db.scalar(select(Call).where(Call.call_id == request.call_id))
     if not call:
         raise HTTPException(status_code=404, detail="Call not found")
 
-    coachable_segments = (
-        db.query(Segment)
-        .filter(Segment.call_id == request.call_id, Segment.is_coachable == 1)
+    # Coachable segments are final once a call completes, so its replay
+    # audio is synthesized once and then served from the cached path.
+    cache = get_cache_service()
+    cache_key = f"replay:v1:{request.call_id}"
+    cacheable = call.status == "completed"
+    if cacheable:
+        cached_path = await run_in_threadpool(cache.get, cache_key)
+        if cached_path and os.path.exists(cached_path):
+            return _audio_file_response(cached_path, _SUFFIX_MEDIA.get(Path(cached_path).suffix, "audio/mpeg"))
+
+    result = await db.scalars(
+        select(Segment)
+        .where(Segment.call_id == request.call_id, Segment.is_coachable == 1)
         .order_by(Segment.start_time)
-        .all()
     )
+    coachable_segments = result.all()
 
     if not coachable_segments:
         raise HTTPException(status_code=404, detail="No coachable moments found")
@@ -211,8 +308,10 @@ async def replay(request: ReplayRequest, db: Session = Depends(get_db)):
 
     try:
         tts = get_tts_service()
-        audio_path = tts.synthesize(text=composite_text)
-        return FileResponse(path=audio_path, media_type="audio/mpeg")
+        audio_path = await run_in_threadpool(tts.synthesize, text=composite_text)
+        if cacheable:
+            await run_in_threadpool(cache.set, cache_key, audio_path, ttl=settings.TTS_CACHE_TTL_SECONDS)
+        return _audio_file_response(audio_path, _SUFFIX_MEDIA.get(Path(audio_path).suffix, "audio/mpeg"))
     except Exception as e:
         logger.error(f"Replay failed: {e}")
         raise HTTPException(status_code=500, detail="Replay failed")
@@ -11,6 +11,13 @@ from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Sync URL scheme -> async driver, used for the API's AsyncEngine
+_ASYNC_DRIVERS = (
+    ("sqlite:", "sqlite+aiosqlite:"),
+    ("postgresql+psycopg2:", "postgresql+asyncpg:"),
+    ("postgresql:", "postgresql+asyncpg:"),
+)
+
 
 class Settings(BaseSettings):
     """Application-wide configuration sourced from environment variables."""
@@ -32,8 +39,12 @@ class Settings(BaseSettings):
     # ── Database ─────────────────────────────────────────────────────────
     DATABASE_URL: str = "sqlite:///./darwix.db"
     DB_ECHO: bool = False
-    DB_POOL_SIZE: int = 5
-    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800
+    DB_SLOW_QUERY_MS: int = 100
+    SQLITE_CHECKPOINT_INTERVAL_SECONDS: int = 300
+    SQLITE_ANALYZE_INTERVAL_SECONDS: int = 24 * 3600
 
     # ── File Storage ─────────────────────────────────────────────────────
     UPLOAD_DIR: str = "uploads"
@@ -41,28 +52,58 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE_MB: int = 50
 
     # ── STT (Speech-to-Text) ────────────────────────────────────────────
-    STT_PROVIDER: Literal["whisper"] = "whisper"
+    STT_PROVIDER: Literal["faster_whisper", "whisper"] = "faster_whisper"
     WHISPER_MODEL_SIZE: str = "base"
+    WHISPER_DEVICE: str = "auto"  # faster_whisper only: auto | cpu | cuda
+    WHISPER_COMPUTE_TYPE: str = "int8"  # faster_whisper only: int8 | int8_float16 | float16 | float32
+    WHISPER_VAD_FILTER: bool = True  # faster_whisper only: skip silence with Silero VAD
 
     # ── TTS (Text-to-Speech) ────────────────────────────────────────────
     TTS_PROVIDER: Literal["gtts", "pyttsx3"] = "gtts"
+    TTS_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    TTS_MAX_CONCURRENCY: int = 4  # parallel gTTS requests per synthesis (one per sentence)
 
     # ── Sentiment Analysis ───────────────────────────────────────────────
     SENTIMENT_MODEL: str = "distilbert-base-uncased-finetuned-sst-2-english"
     SENTIMENT_ENABLED: bool = True
+    SENTIMENT_QUANTIZE: bool = False  # INT8 dynamic quantization for CPU inference
+    SENTIMENT_DEVICE: str = "auto"  # auto | cpu | cuda; CUDA runs the model in FP16
+    SENTIMENT_BATCH_MAX: int = 32
+    SENTIMENT_INFERENCE_BATCH_SIZE: int = 16
+    SENTIMENT_BATCH_WAIT_MS: int = 10
+    SENTIMENT_CACHE_SIZE: int = 10_000  # short texts remembered in-process; 0 disables
+    SENTIMENT_CACHE_MAX_CHARS: int = 64  # longer texts rarely repeat and are never cached
 
     # ── Coachable Moment Detection ───────────────────────────────────────
     COACHABLE_CONFIDENCE_THRESHOLD: float = 0.5
 
-    # ── Celery / Task Queue (future) ─────────────────────────────────────
+    # ── Celery / Task Queue ──────────────────────────────────────────────
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/1"
+    PRELOAD_MODELS: bool = True  # load + warm up ML models (workers) and the TTS library (API) at startup
+    TORCH_NUM_THREADS: int = 4  # intra-op threads per worker process; 0 = PyTorch default
+    CELERY_WORKER_CONCURRENCY: int = 0  # prefork processes; 0 = CPU cores // TORCH_NUM_THREADS
+
+    # ── Cache (Redis) ────────────────────────────────────────────────────
+    CACHE_ENABLED: bool = True
+    CACHE_URL: str = "redis://localhost:6379/2"
+    CACHE_RETRY_AFTER_SECONDS: float = 30.0  # skip Redis this long after a connection failure
+    CALL_DETAIL_CACHE_TTL_SECONDS: int = 24 * 3600
 
     # ── Derived helpers ──────────────────────────────────────────────────
     @property
     def is_sqlite(self) -> bool:
         return self.DATABASE_URL.startswith("sqlite")
 
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_URL with its driver swapped for the asyncio equivalent."""
+        url = self.DATABASE_URL
+        for sync_prefix, async_prefix in _ASYNC_DRIVERS:
+            if url.startswith(sync_prefix):
+                return async_prefix + url[len(sync_prefix):]
+        return url
+
     @property
     def upload_path(self) -> Path:
         p = Path(self.UPLOAD_DIR)
@@ -5,21 +5,29 @@ Produces JSON-formatted log lines suitable for production log aggregation
 (ELK, Datadog, CloudWatch, etc.).
 """
 
-import json
 import logging
 import sys
 from datetime import datetime, timezone
 from typing import Any
 
+import orjson
+
 from app.core.config import get_settings
 
+# Extra data may carry non-string keys (e.g. segment indexes)
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+_UTC = timezone.utc
+_fromtimestamp = datetime.fromtimestamp
+
 
 class StructuredFormatter(logging.Formatter):
     """Formats log records as JSON for machine-parseable output."""
 
     def format(self, record: logging.LogRecord) -> str:
         log_entry: dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # record.created is set when the record is made; orjson formats the
+            # datetime as ISO-8601 natively
+            "timestamp": _fromtimestamp(record.created, _UTC),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -36,7 +44,7 @@ class StructuredFormatter(logging.Formatter):
         if hasattr(record, "extra_data"):
             log_entry["data"] = record.extra_data
 
-        return json.dumps(log_entry, default=str)
+        return orjson.dumps(log_entry, default=str, option=_ORJSON_OPTIONS).decode()
 
 
 def setup_logging() -> None:
@@ -23,6 +23,17 @@ from sqlalchemy import (
 from sqlalchemy.orm import DeclarativeBase, relationship
 
 
+def new_call_id() -> str:
+    """
+    Generate a call identifier.
+
+    Call IDs are created in Python, not by the database. The API needs the
+    ID before the row exists, to name the uploaded file and the queued task,
+    and clients may supply their own non-UUID IDs.
+    """
+    return str(uuid.uuid4())
+
+
 class Base(DeclarativeBase):
     """Declarative base for all models."""
     pass
@@ -34,11 +45,11 @@ class Call(Base):
     __tablename__ = "calls"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    call_id = Column(String(64), unique=True, nullable=False, index=True, default=lambda: str(uuid.uuid4()))
+    call_id = Column(String(64), unique=True, nullable=False, index=True, default=new_call_id)
     agent_id = Column(String(128), nullable=True)
     customer_id = Column(String(128), nullable=True)
     audio_filename = Column(String(512), nullable=True)
-    status = Column(String(32), nullable=False, default="pending")  # pending | processing | completed | failed
+    status = Column(String(32), nullable=False, default="pending")  # pending | queued | processing | completed | failed
     created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -46,6 +57,11 @@ class Call(Base):
     transcript = relationship("Transcript", back_populates="call", uselist=False, cascade="all, delete-orphan")
     segments = relationship("Segment", back_populates="call", cascade="all, delete-orphan", order_by="Segment.start_time")
 
+    # Lets the dashboard's newest-first listing read the index instead of sorting
+    __table_args__ = (
+        Index("ix_calls_created_at", created_at.desc()),
+    )
+
     def __repr__(self) -> str:
         return f"<Call(call_id={self.call_id}, status={self.status})>"
 
@@ -92,6 +108,8 @@ class Segment(Base):
     # Composite index for efficient queries
     __table_args__ = (
         Index("ix_segments_call_speaker", "call_id", "speaker"),
+        # Covers /replay: filter on call_id + is_coachable, already ordered by start_time
+        Index("ix_segments_coachable_replay", "call_id", "is_coachable", "start_time"),
     )
 
     def __repr__(self) -> str:
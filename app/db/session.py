@@ -2,24 +2,40 @@
 Database engine and session management.
 
 Supports SQLite (development) and PostgreSQL (production) via DATABASE_URL.
-Provides async-ready session factory with connection pooling.
+
+Two engines share the same database:
+    - async_engine / AsyncSessionLocal: used by the FastAPI request handlers
+      (aiosqlite / asyncpg), so DB round-trips never block the event loop.
+    - engine / SessionLocal: synchronous, used by the Celery worker.
 """
 
-from collections.abc import Generator
+import asyncio
+import time
+from collections.abc import AsyncGenerator
 
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Production tuning for SQLite; skipped in DEBUG so local runs keep full durability
+_SQLITE_TUNING_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # with WAL: fsync per checkpoint, not per commit
+    "PRAGMA mmap_size=268435456",  # 256 MiB memory-mapped reads
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA optimize=0x10002",  # cheap on open; refreshes stale planner statistics
+)
+
 
-def _build_engine():
-    """Create SQLAlchemy engine based on configuration."""
+def _engine_kwargs() -> dict:
+    """Engine options shared by the sync and async engines."""
     settings = get_settings()
-    url = settings.DATABASE_URL
 
     connect_args: dict = {}
     pool_kwargs: dict = {}
@@ -32,15 +48,16 @@ def _build_engine():
         pool_kwargs.update(
             pool_size=settings.DB_POOL_SIZE,
             max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,  # drop connections before server-side timeouts
             pool_pre_ping=True,  # verify connections before use
         )
 
-    engine = create_engine(
-        url,
-        echo=settings.DB_ECHO,
-        connect_args=connect_args,
-        **pool_kwargs,
-    )
+    return {"echo": settings.DB_ECHO, "connect_args": connect_args, **pool_kwargs}
+
+
+def _configure_engine(engine: Engine) -> None:
+    """Attach SQLite pragmas and slow-query logging to a (sync) engine."""
+    settings = get_settings()
 
     # Enable WAL and foreign keys for SQLite
     if settings.is_sqlite:
@@ -49,13 +66,56 @@ def _build_engine():
             cursor = dbapi_conn.cursor()
             cursor.execute("PRAGMA journal_mode=WAL")
             cursor.execute("PRAGMA foreign_keys=ON")
+            # Wait for the worker's write lock instead of failing with "database is locked"
+            cursor.execute("PRAGMA busy_timeout=5000")
+            if not settings.DEBUG:
+                for pragma in _SQLITE_TUNING_PRAGMAS:
+                    cursor.execute(pragma)
             cursor.close()
 
+    _log_slow_queries(engine, settings.DB_SLOW_QUERY_MS)
+
+
+def _build_engine() -> Engine:
+    """Create the synchronous SQLAlchemy engine used by background workers."""
+    url = get_settings().DATABASE_URL
+    engine = create_engine(url, **_engine_kwargs())
+    _configure_engine(engine)
+
     logger.info("Database engine created", extra={"extra_data": {"url": url.split("@")[-1]}})
     return engine
 
 
+def _build_async_engine() -> AsyncEngine:
+    """Create the async SQLAlchemy engine used by the API."""
+    url = get_settings().async_database_url
+    engine = create_async_engine(url, **_engine_kwargs())
+    # Events are registered on the sync facade the async engine drives
+    _configure_engine(engine.sync_engine)
+
+    logger.info("Async database engine created", extra={"extra_data": {"url": url.split("@")[-1]}})
+    return engine
+
+
+def _log_slow_queries(engine, threshold_ms: int) -> None:
+    """Log statements on ``engine`` that take longer than ``threshold_ms``."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+        if elapsed_ms >= threshold_ms:
+            logger.warning(
+                f"Slow query ({elapsed_ms:.1f} ms)",
+                extra={"extra_data": {"duration_ms": round(elapsed_ms, 1), "statement": statement[:500]}},
+            )
+
+
 engine = _build_engine()
+async_engine = _build_async_engine()
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -64,18 +124,46 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    FastAPI dependency that yields a database session.
+    FastAPI dependency that yields an async database session.
 
     Usage:
         @router.get("/")
-        def endpoint(db: Session = Depends(get_db)):
+        async def endpoint(db: AsyncSession = Depends(get_db)):
             ...
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def sqlite_maintenance_loop() -> None:
+    """
+    Periodic SQLite housekeeping, run as a background task by the API.
+
+    Truncates the WAL every SQLITE_CHECKPOINT_INTERVAL_SECONDS so it cannot
+    grow without bound under steady writes, and runs ANALYZE every
+    SQLITE_ANALYZE_INTERVAL_SECONDS to keep planner statistics current.
+    Errors are logged and the loop keeps going.
+    """
+    settings = get_settings()
+    last_analyze = time.monotonic()
+
+    while True:
+        await asyncio.sleep(settings.SQLITE_CHECKPOINT_INTERVAL_SECONDS)
+        try:
+            async with async_engine.connect() as conn:
+                await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+                if time.monotonic() - last_analyze >= settings.SQLITE_ANALYZE_INTERVAL_SECONDS:
+                    await conn.exec_driver_sql("ANALYZE")
+                    last_analyze = time.monotonic()
+                    logger.info("SQLite statistics refreshed")
+        except Exception as e:
+            logger.warning(f"SQLite maintenance failed: {e}")
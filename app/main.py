@@ -5,10 +5,12 @@ FastAPI application factory with lifecycle management,
 middleware configuration, and structured error handling.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime, timezone
 
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
@@ -17,8 +19,9 @@ from app.core.config import get_settings
 from app.core.exceptions import DarwixBaseError
 from app.core.logging import get_logger, setup_logging
 from app.db.models import Base
-from app.db.session import engine
+from app.db.session import async_engine, sqlite_maintenance_loop
 from app.schemas.models import ErrorResponse, HealthResponse
+from app.services.tts_service import get_tts_service
 
 # ── Initialise logging ──────────────────────────────────────────────────
 setup_logging()
@@ -42,7 +45,8 @@ async def lifespan(app: FastAPI):
     except ImportError:
         logger.warning("static-ffmpeg not installed, relying on system FFmpeg")
 
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables ensured")
 
     # Ensure directories exist
@@ -50,9 +54,24 @@ async def lifespan(app: FastAPI):
     settings.output_path
     logger.info("Storage directories verified")
 
+    # /speak and /replay are the only endpoints that run a model-backed
+    # library in this process; import it now rather than on the first call
+    if settings.PRELOAD_MODELS:
+        try:
+            await run_in_threadpool(get_tts_service().warmup)
+        except Exception as e:
+            logger.warning(f"TTS preload failed, falling back to lazy loading: {e}")
+
+    maintenance_task = asyncio.create_task(sqlite_maintenance_loop()) if settings.is_sqlite else None
+
     yield
 
     # Shutdown
+    if maintenance_task:
+        maintenance_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await maintenance_task
+    await async_engine.dispose()
     logger.info(f"Shutting down {settings.APP_NAME}")
 
 
@@ -6,7 +6,7 @@ Enforces strict input validation and provides typed response contracts.
 
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
 
 
 # ── Segment Schemas ──────────────────────────────────────────────────────
@@ -22,8 +22,16 @@ class SegmentResponse(BaseModel):
     is_coachable: bool = Field(False, description="Whether this segment is a coachable moment")
     coachable_type: Optional[str] = Field(None, description="Type: objection, buying_signal, hesitation")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+    # Stored at full precision; rounded only for the API response
+    @field_serializer("start_time", "end_time")
+    def _round_time(self, value: float) -> float:
+        return round(value, 2)
+
+    @field_serializer("sentiment_score")
+    def _round_score(self, value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value, 4)
 
 
 # ── Call List Schemas ───────────────────────────────────────────────────
@@ -35,9 +43,8 @@ class CallSummary(BaseModel):
     created_at: datetime
     agent_id: Optional[str] = None
     customer_id: Optional[str] = None
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CallDetail(BaseModel):
@@ -49,9 +56,8 @@ class CallDetail(BaseModel):
     created_at: datetime
     transcript: Optional[str] = None
     segments: list[SegmentResponse] = []
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ── Transcribe Schemas ───────────────────────────────────────────────────
@@ -65,8 +71,7 @@ class TranscribeResponse(BaseModel):
     duration_seconds: Optional[float] = None
     language: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ── Speak (TTS) Schemas ─────────────────────────────────────────────────
@@ -0,0 +1,103 @@
+"""
+Redis-backed cache for derived artefacts (synthesized audio paths, etc.).
+
+Caching is best-effort: when CACHE_ENABLED is false or Redis is unreachable,
+every lookup is a miss and writes are dropped, so callers never fail
+because of the cache. After a connection failure Redis is not contacted
+again for CACHE_RETRY_AFTER_SECONDS, so an outage costs one timeout rather
+than one per call.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Fail fast when Redis is down instead of stalling the request
+_SOCKET_TIMEOUT_SECONDS = 0.5
+
+
+class CacheService:
+    """Thin key/value wrapper around a lazily-created Redis client."""
+
+    def __init__(self) -> None:
+        self._settings = get_settings()
+        self._enabled = self._settings.CACHE_ENABLED
+        self._client = None
+        # Errors meaning Redis is unreachable; widened with redis' own once imported
+        self._unavailable_errors: tuple[type[Exception], ...] = (ConnectionError, TimeoutError)
+        self._down_until = 0.0
+
+    def _get_client(self):
+        """Lazy-create the Redis client; returns None when caching is disabled."""
+        if not self._enabled:
+            return None
+        if self._down_until and time.monotonic() < self._down_until:
+            return None
+        if self._client is not None:
+            return self._client
+
+        try:
+            import redis  # noqa: local import for lazy loading
+
+            self._client = redis.Redis.from_url(
+                self._settings.CACHE_URL,
+                socket_timeout=_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=_SOCKET_TIMEOUT_SECONDS,
+                decode_responses=True,
+            )
+            self._unavailable_errors += (redis.ConnectionError, redis.TimeoutError)
+        except Exception as e:
+            logger.warning(f"Cache disabled, Redis client unavailable: {e}")
+            self._enabled = False
+            return None
+        return self._client
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss or cache error."""
+        client = self._get_client()
+        if client is None:
+            return None
+        try:
+            return client.get(key)
+        except Exception as e:
+            self._handle_error("get", key, e)
+            return None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store value under key with a TTL in seconds; errors are logged and ignored."""
+        client = self._get_client()
+        if client is None:
+            return
+        try:
+            client.set(key, value, ex=ttl)
+        except Exception as e:
+            self._handle_error("set", key, e)
+
+    def _handle_error(self, op: str, key: str, error: Exception) -> None:
+        """Log a failed cache call and, if Redis is unreachable, stop calling it for a while."""
+        if isinstance(error, self._unavailable_errors):
+            retry_after = self._settings.CACHE_RETRY_AFTER_SECONDS
+            self._down_until = time.monotonic() + retry_after
+            logger.warning(f"Cache {op} failed for {key}, skipping Redis for {retry_after:g}s: {error}")
+        else:
+            logger.warning(f"Cache {op} failed for {key}: {error}")
+
+
+# ── Module-level singleton ───────────────────────────────────────────────
+_cache_service: Optional[CacheService] = None
+_cache_service_lock = threading.Lock()
+
+
+def get_cache_service() -> CacheService:
+    """Return the singleton cache service instance."""
+    global _cache_service
+    if _cache_service is None:
+        with _cache_service_lock:
+            if _cache_service is None:
+                _cache_service = CacheService()
+    return _cache_service
@@ -14,17 +14,20 @@ Designed for future replacement with a trained NLP classifier.
 """
 
 import re
+import threading
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Optional
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.services.sentiment_service import SentimentResult
 from app.services.stt_service import TranscriptionSegment
 
 logger = get_logger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class CoachableMoment:
     """Detected coachable moment metadata."""
     segment_index: int
@@ -34,36 +37,125 @@ class CoachableMoment:
 
 
 # ── Pattern Definitions ──────────────────────────────────────────────────
+# Authored lowercase and compiled case-sensitive: detect() searches the
+# lowercased segment text, so the engine never case-folds per character.
 
 OBJECTION_PATTERNS: list[re.Pattern] = [
-    re.compile(r"\b(too expensive|too costly|over budget|can't afford|out of.*budget)\b", re.IGNORECASE),
-    re.compile(r"\b(not sure|not convinced|don't think|don't see the value)\b", re.IGNORECASE),
-    re.compile(r"\b(competitor|alternative|other option|someone else|another vendor)\b", re.IGNORECASE),
-    re.compile(r"\b(not the right time|bad timing|maybe later|not now|next quarter)\b", re.IGNORECASE),
-    re.compile(r"\b(need to think|discuss with|check with|get back to you|talk to my)\b", re.IGNORECASE),
-    re.compile(r"\b(doesn't fit|won't work|not what we need|don't need)\b", re.IGNORECASE),
-    re.compile(r"\b(price|pricing|cost|expensive|budget|afford)\b", re.IGNORECASE),
+    re.compile(r"\b(too expensive|too costly|over budget|can't afford|out of.*budget)\b"),
+    re.compile(r"\b(not sure|not convinced|don't think|don't see the value)\b"),
+    re.compile(r"\b(competitor|alternative|other option|someone else|another vendor)\b"),
+    re.compile(r"\b(not the right time|bad timing|maybe later|not now|next quarter)\b"),
+    re.compile(r"\b(need to think|discuss with|check with|get back to you|talk to my)\b"),
+    re.compile(r"\b(doesn't fit|won't work|not what we need|don't need)\b"),
+    re.compile(r"\b(price|pricing|cost|expensive|budget|afford)\b"),
 ]
 
 BUYING_SIGNAL_PATTERNS: list[re.Pattern] = [
-    re.compile(r"\b(sounds good|sounds great|interesting|love that|that's exactly)\b", re.IGNORECASE),
-    re.compile(r"\b(how soon|when can|how quickly|timeline|onboarding)\b", re.IGNORECASE),
-    re.compile(r"\b(pricing|what does it cost|subscription|plan options|packages)\b", re.IGNORECASE),
-    re.compile(r"\b(sign up|get started|move forward|next steps|contract)\b", re.IGNORECASE),
-    re.compile(r"\b(our team|we would|we could|we need|we want)\b", re.IGNORECASE),
-    re.compile(r"\b(demo|trial|pilot|proof of concept|POC)\b", re.IGNORECASE),
-    re.compile(r"\b(integration|API|connect|implement)\b", re.IGNORECASE),
+    re.compile(r"\b(sounds good|sounds great|interesting|love that|that's exactly)\b"),
+    re.compile(r"\b(how soon|when can|how quickly|timeline|onboarding)\b"),
+    re.compile(r"\b(pricing|what does it cost|subscription|plan options|packages)\b"),
+    re.compile(r"\b(sign up|get started|move forward|next steps|contract)\b"),
+    re.compile(r"\b(our team|we would|we could|we need|we want)\b"),
+    re.compile(r"\b(demo|trial|pilot|proof of concept|poc)\b"),
+    re.compile(r"\b(integration|api|connect|implement)\b"),
 ]
 
 HESITATION_PATTERNS: list[re.Pattern] = [
-    re.compile(r"\b(um+|uh+|hmm+|er+|ah+)\b", re.IGNORECASE),
-    re.compile(r"\b(I guess|I suppose|maybe|perhaps|not sure|uncertain)\b", re.IGNORECASE),
-    re.compile(r"\b(kind of|sort of|I don't know|hard to say)\b", re.IGNORECASE),
-    re.compile(r"\.\.\.", re.IGNORECASE),  # trailing ellipsis
-    re.compile(r"\b(well|so|you know|like)\b", re.IGNORECASE),
+    re.compile(r"\b(um+|uh+|hmm+|er+|ah+)\b"),
+    re.compile(r"\b(i guess|i suppose|maybe|perhaps|not sure|uncertain)\b"),
+    re.compile(r"\b(kind of|sort of|i don't know|hard to say)\b"),
+    re.compile(r"\.\.\."),  # trailing ellipsis
+    re.compile(r"\b(well|so|you know|like)\b"),
 ]
 
 
+def _fuse_patterns(patterns: list[re.Pattern]) -> re.Pattern:
+    """Combine a category's patterns into one case-insensitive alternation that matches if any of them would."""
+    return re.compile("|".join(f"(?:{p.pattern})" for p in patterns), re.IGNORECASE)
+
+
+def _casefold_patterns(patterns: list[re.Pattern]) -> list[re.Pattern]:
+    """IGNORECASE twins of the given patterns, for text where str.lower() is not exact."""
+    return [re.compile(p.pattern, re.IGNORECASE) for p in patterns]
+
+
+def _required_keywords(pattern: re.Pattern) -> tuple[str, ...]:
+    """
+    Lowercase literals, one per alternative, at least one of which must occur
+    in any text the pattern matches.
+
+    Each alternative contributes its leading literal run: ``um+`` gives
+    "um", ``out of.*budget`` gives "out of", ``\\.\\.\\.`` gives "...".
+    Returns an empty tuple when some alternative has no literal prefix, in
+    which case the pattern cannot be prefiltered.
+    """
+    source = pattern.pattern
+    if source.startswith(r"\b(") and source.endswith(r")\b"):
+        source = source[3:-3]
+
+    keywords: list[str] = []
+    for alternative in source.split("|"):
+        literal: list[str] = []
+        i = 0
+        while i < len(alternative):
+            char = alternative[i]
+            if char == "\\" and i + 1 < len(alternative) and not alternative[i + 1].isalnum():
+                literal.append(alternative[i + 1])
+                i += 2
+                continue
+            if char in "*?{":
+                # Optional or variable repeat of the previous character
+                if literal:
+                    literal.pop()
+                break
+            if char == "+" or char in ".^$[]()|\\":
+                break
+            literal.append(char)
+            i += 1
+        if not literal:
+            return ()
+        keywords.append("".join(literal).lower())
+    return tuple(keywords)
+
+
+@dataclass(frozen=True)
+class _Category:
+    """A coachable category with its bound pattern searches and literal prefilters."""
+    name: str
+    boost_sentiment: Optional[str]
+    # Per pattern: (search of lowercased text, required keywords; () = no prefilter)
+    searches: tuple[tuple[Callable[[str], Optional[re.Match]], tuple[str, ...]], ...]
+    ignorecase_searches: tuple[Callable[[str], Optional[re.Match]], ...]  # for non-ASCII text
+    any_search: Callable[[str], Optional[re.Match]]  # matches if any pattern would
+    any_keywords: tuple[str, ...]  # union of keywords; empty when any pattern lacks them
+
+
+def _build_category(name: str, patterns: list[re.Pattern], boost_sentiment: Optional[str]) -> _Category:
+    """Precompute the fused pattern and keyword prefilters for a category."""
+    keywords = [_required_keywords(p) for p in patterns]
+    any_keywords = () if not all(keywords) else tuple(k for ks in keywords for k in ks)
+    return _Category(
+        name=name,
+        boost_sentiment=boost_sentiment,
+        searches=tuple((p.search, k) for p, k in zip(patterns, keywords)),
+        ignorecase_searches=tuple(p.search for p in _casefold_patterns(patterns)),
+        any_search=_fuse_patterns(patterns).search,
+        any_keywords=any_keywords,
+    )
+
+
+# Base confidence saturates at 0.85 from this many matches on (0.3 + 4 x 0.15),
+# so further patterns cannot change the result
+_SATURATING_MATCH_COUNT = 4
+
+# Checked in order; the first category whose confidence clears the threshold wins
+_CATEGORIES: tuple[_Category, ...] = (
+    _build_category("objection", OBJECTION_PATTERNS, "NEGATIVE"),
+    _build_category("buying_signal", BUYING_SIGNAL_PATTERNS, "POSITIVE"),
+    _build_category("hesitation", HESITATION_PATTERNS, None),
+)
+
+
 class CoachableDetectionService:
     """
     Detects coachable moments in transcription segments.
@@ -81,35 +173,48 @@ class CoachableDetectionService:
     def detect(
         self,
         segments: list[TranscriptionSegment],
-        sentiments: list[Optional[dict]] | None = None,
+        sentiments: list[Optional[SentimentResult]] | None = None,
     ) -> list[CoachableMoment]:
         """
         Scan segments for coachable moments.
 
         Args:
             segments: List of transcription segments.
-            sentiments: Optional parallel list of sentiment dicts
-                        with keys 'label' and 'score'.
+            sentiments: Optional parallel list of SentimentResult
+                        (None where no sentiment is available).
 
         Returns:
             List of detected CoachableMoment instances.
         """
         moments: list[CoachableMoment] = []
+        # Loop-invariant lookups hoisted into locals for the per-segment loop
+        append_moment = moments.append
+        check_patterns = self._check_patterns
+        threshold = self._threshold
+        categories = _CATEGORIES
 
         for i, seg in enumerate(segments):
             text = seg.text
             sentiment = sentiments[i] if sentiments and i < len(sentiments) else None
 
+            # Lowercase once per segment: substring checks on it rule out most
+            # patterns without entering the regex engine, and the rest search
+            # it case-sensitively. Only exact for ASCII: re's IGNORECASE
+            # folding differs from str.lower() for a few code points, so
+            # other text is searched with the IGNORECASE patterns instead.
+            lowered = text.lower() if text.isascii() else None
+
             # Check each category
-            for category, patterns, boost_sentiment in [
-                ("objection", OBJECTION_PATTERNS, "NEGATIVE"),
-                ("buying_signal", BUYING_SIGNAL_PATTERNS, "POSITIVE"),
-                ("hesitation", HESITATION_PATTERNS, None),
-            ]:
-                result = self._check_patterns(text, patterns, category, sentiment, boost_sentiment)
-                if result and result.confidence >= self._threshold:
+            for category in categories:
+                if lowered is not None and category.any_keywords:
+                    if not any(k in lowered for k in category.any_keywords):
+                        continue
+                elif not category.any_search(text):
+                    continue
+                result = check_patterns(text, lowered, category, sentiment)
+                if result and result.confidence >= threshold:
                     result.segment_index = i
-                    moments.append(result)
+                    append_moment(result)
                     break  # one label per segment to avoid noise
 
         logger.info(f"Coachable detection: {len(moments)} moments found in {len(segments)} segments")
@@ -118,17 +223,31 @@ class CoachableDetectionService:
     def _check_patterns(
         self,
         text: str,
-        patterns: list[re.Pattern],
-        category: str,
-        sentiment: Optional[dict],
-        boost_sentiment: Optional[str],
+        lowered: Optional[str],
+        category: _Category,
+        sentiment: Optional[SentimentResult],
     ) -> Optional[CoachableMoment]:
-        """Check text against pattern list with sentiment boosting."""
+        """Check text against a category's patterns with sentiment boosting."""
+        boost_sentiment = category.boost_sentiment
         matched_patterns: list[str] = []
-        for pattern in patterns:
-            match = pattern.search(text)
-            if match:
-                matched_patterns.append(match.group())
+        append_match = matched_patterns.append
+        if lowered is not None:
+            for search, keywords in category.searches:
+                if keywords and not any(k in lowered for k in keywords):
+                    continue
+                match = search(lowered)
+                if match:
+                    # ASCII lowercasing preserves offsets; report the original casing
+                    append_match(text[match.start():match.end()])
+                    if len(matched_patterns) >= _SATURATING_MATCH_COUNT:
+                        break
+        else:
+            for search in category.ignorecase_searches:
+                match = search(text)
+                if match:
+                    append_match(match.group())
+                    if len(matched_patterns) >= _SATURATING_MATCH_COUNT:
+                        break
 
         if not matched_patterns:
             return None
@@ -138,12 +257,13 @@ class CoachableDetectionService:
 
         # Sentiment boost
         if sentiment and boost_sentiment:
-            if sentiment.get("label", "").upper() == boost_sentiment:
+            # SentimentService already normalizes labels to upper case
+            if sentiment.label == boost_sentiment:
                 base_confidence = min(base_confidence + 0.15, 1.0)
 
         return CoachableMoment(
             segment_index=0,  # will be set by caller
-            coachable_type=category,
+            coachable_type=category.name,
             confidence=round(base_confidence, 3),
             matched_pattern=", ".join(matched_patterns[:3]),
         )
@@ -151,11 +271,14 @@ class CoachableDetectionService:
 
 # ── Module-level singleton ───────────────────────────────────────────────
 _detection_service: Optional[CoachableDetectionService] = None
+_detection_service_lock = threading.Lock()
 
 
 def get_coachable_service() -> CoachableDetectionService:
     """Return the singleton coachable detection service instance."""
     global _detection_service
     if _detection_service is None:
-        _detection_service = CoachableDetectionService()
+        with _detection_service_lock:
+            if _detection_service is None:
+                _detection_service = CoachableDetectionService()
     return _detection_service
@@ -2,9 +2,14 @@
 Sentiment analysis service using HuggingFace Transformers.
 
 Provides per-utterance sentiment classification (POSITIVE / NEGATIVE / NEUTRAL).
-Lazy-loads the pipeline to avoid blocking startup.
+Lazy-loads the model to avoid blocking startup.
 """
 
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from dataclasses import dataclass
 from typing import Optional
 
@@ -15,45 +20,134 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class SentimentResult:
     """Result of sentiment analysis for a single text segment."""
     label: str  # POSITIVE | NEGATIVE | NEUTRAL
     score: float  # confidence 0.0 – 1.0
 
 
+class _SequenceClassifier:
+    """
+    Tokenizer + sequence-classification model called directly.
+
+    Honours the same call contract as a transformers "sentiment-analysis"
+    pipeline (a text or list of texts in, ``{"label", "score"}`` dicts out)
+    without the pipeline's per-call preprocessing/DataLoader machinery.
+    """
+
+    def __init__(self, model_name: str, max_length: int = 512, quantize: bool = False, device: str = "auto") -> None:
+        import torch  # noqa: local import for lazy loading
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self._torch = torch
+        self._tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self._model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        self._id2label = self._model.config.id2label
+
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        self._device = torch.device(device)
+
+        if self._device.type == "cuda":
+            # FP16 weights: half the memory and tensor-core matmuls
+            self._model = self._model.half().to(self._device)
+            logger.info("Sentiment model loaded on CUDA in FP16")
+        elif quantize:
+            # INT8 weights for the Linear layers (FBGEMM kernels on x86 CPUs)
+            self._model = torch.ao.quantization.quantize_dynamic(self._model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("Sentiment model dynamically quantized to INT8")
+        self._max_length = max_length
+
+    def __call__(self, texts: str | list[str], batch_size: int = 16) -> list[dict]:
+        if isinstance(texts, str):
+            texts = [texts]
+
+        on_cuda = self._device.type == "cuda"
+        outputs: list[dict] = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self._tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self._max_length,
+                return_tensors="pt",
+            )
+            if on_cuda:
+                # Page-locked host buffers let the copy overlap with compute
+                encoded = {k: v.pin_memory().to(self._device, non_blocking=True) for k, v in encoded.items()}
+            with self._torch.inference_mode():
+                # Softmax in FP32 so FP16 logits don't lose score precision
+                probs = self._model(**encoded).logits.float().softmax(dim=-1)
+            scores, label_ids = probs.max(dim=-1)
+            outputs.extend(
+                {"label": self._id2label[label_id], "score": score}
+                for score, label_id in zip(scores.tolist(), label_ids.tolist())
+            )
+        return outputs
+
+
 class SentimentService:
     """
-    Sentiment analysis service backed by HuggingFace pipeline.
+    Sentiment analysis service backed by a HuggingFace classifier.
 
     Uses distilbert-base-uncased-finetuned-sst-2-english by default.
+
+    Texts passed to submit() are collected by a background thread into
+    micro-batches (up to SENTIMENT_BATCH_MAX texts, or whatever arrives
+    within SENTIMENT_BATCH_WAIT_MS). The worker runs one call per process,
+    so a batch holds segments of that single call: the pipeline submits
+    each segment as the decoder emits it, and classification of earlier
+    segments overlaps with transcription of the rest of the audio.
+
+    Short texts ("yeah", "okay", "um") recur constantly in call audio, so
+    analyze_batch() keeps an in-process LRU of results for texts up to
+    SENTIMENT_CACHE_MAX_CHARS and only runs the model on texts it has not
+    classified before.
     """
 
     def __init__(self) -> None:
         self._pipeline = None
         self._settings = get_settings()
+        self._queue: queue.SimpleQueue[tuple[str, Future]] = queue.SimpleQueue()
+        self._batcher: Optional[threading.Thread] = None
+        self._batcher_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._cache: OrderedDict[str, SentimentResult] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def _load_pipeline(self) -> None:
-        """Lazy-load the HuggingFace sentiment pipeline."""
+        """Lazy-load the sentiment tokenizer and model."""
         if self._pipeline is not None:
             return
 
-        try:
-            from transformers import pipeline as hf_pipeline
+        with self._load_lock:
+            # Another thread may have finished loading while we waited
+            if self._pipeline is None:
+                self._load_pipeline_locked()
 
+    def _load_pipeline_locked(self) -> None:
+        """Load the tokenizer and model; the caller holds _load_lock."""
+        try:
             model_name = self._settings.SENTIMENT_MODEL
             logger.info(f"Loading sentiment model: {model_name}")
-            self._pipeline = hf_pipeline(
-                "sentiment-analysis",
-                model=model_name,
-                truncation=True,
+            self._pipeline = _SequenceClassifier(
+                model_name,
                 max_length=512,
+                quantize=self._settings.SENTIMENT_QUANTIZE,
+                device=self._settings.SENTIMENT_DEVICE,
             )
             logger.info("Sentiment model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load sentiment model: {e}")
             raise SentimentAnalysisError(f"Model load failed: {e}") from e
 
+    def warmup(self) -> None:
+        """Load the pipeline and run one short classification."""
+        self._load_pipeline()
+        self._pipeline(["warmup"])
+        logger.info("Sentiment model warmed up")
+
     def analyze(self, text: str) -> SentimentResult:
         """
         Analyze sentiment of a single text string.
@@ -72,7 +166,7 @@ class SentimentService:
             result = self._pipeline(text[:512])[0]  # truncate input
 
             label = result["label"].upper()
-            score = round(float(result["score"]), 4)
+            score = float(result["score"])
 
             return SentimentResult(label=label, score=score)
 
@@ -98,27 +192,115 @@ class SentimentService:
         try:
             self._load_pipeline()
             truncated = [t[:512] if t else "" for t in texts]
-            results = self._pipeline(truncated)
-
-            return [
-                SentimentResult(
-                    label=r["label"].upper(),
-                    score=round(float(r["score"]), 4),
-                )
-                for r in results
-            ]
+
+            known = self._cache_lookup(truncated)
+            # Each distinct uncached text goes through the model once
+            pending = list(dict.fromkeys(t for t in truncated if t not in known))
+
+            # Feed texts shortest-first so each batch the pipeline forms holds
+            # similar lengths and pads only to its own longest text.
+            pending.sort(key=len)
+            fresh: dict[str, SentimentResult] = {}
+            if pending:
+                batch_size = self._settings.SENTIMENT_INFERENCE_BATCH_SIZE
+                for text, r in zip(pending, self._pipeline(pending, batch_size=batch_size)):
+                    fresh[text] = SentimentResult(label=r["label"].upper(), score=float(r["score"]))
+                self._cache_store(fresh)
+
+            known.update(fresh)
+            return [known[t] for t in truncated]
         except Exception as e:
             logger.warning(f"Batch sentiment analysis failed: {e}")
             return [SentimentResult(label="NEUTRAL", score=0.0) for _ in texts]
 
+    def _cache_lookup(self, texts: list[str]) -> dict[str, SentimentResult]:
+        """Return cached results for whichever of ``texts`` have them."""
+        if not self._settings.SENTIMENT_CACHE_SIZE:
+            return {}
+        found: dict[str, SentimentResult] = {}
+        with self._cache_lock:
+            for text in texts:
+                result = self._cache.get(text)
+                if result is not None:
+                    self._cache.move_to_end(text)
+                    found[text] = result
+        return found
+
+    def _cache_store(self, results: dict[str, SentimentResult]) -> None:
+        """Remember results for short texts, evicting the least recently used."""
+        max_size = self._settings.SENTIMENT_CACHE_SIZE
+        if not max_size:
+            return
+        max_chars = self._settings.SENTIMENT_CACHE_MAX_CHARS
+        with self._cache_lock:
+            for text, result in results.items():
+                if len(text) <= max_chars:
+                    self._cache[text] = result
+            while len(self._cache) > max_size:
+                self._cache.popitem(last=False)
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for micro-batched sentiment analysis.
+
+        Args:
+            text: Input text to classify.
+
+        Returns:
+            Future resolving to a SentimentResult.
+        """
+        future: Future = Future()
+        self._queue.put((text, future))
+        self._ensure_batcher()
+        return future
+
+    def _ensure_batcher(self) -> None:
+        """Start the batching thread on first use (and after a fork)."""
+        if self._batcher is not None and self._batcher.is_alive():
+            return
+        with self._batcher_lock:
+            if self._batcher is None or not self._batcher.is_alive():
+                self._batcher = threading.Thread(target=self._batch_loop, name="sentiment-batcher", daemon=True)
+                self._batcher.start()
+
+    def _batch_loop(self) -> None:
+        """Drain queued texts into batches and resolve their futures."""
+        max_size = self._settings.SENTIMENT_BATCH_MAX
+        max_wait = self._settings.SENTIMENT_BATCH_WAIT_MS / 1000
+
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + max_wait
+            while len(items) < max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.analyze_batch([text for text, _ in items])
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(items, results):
+                future.set_result(result)
+
 
 # ── Module-level singleton ───────────────────────────────────────────────
 _sentiment_service: Optional[SentimentService] = None
+_sentiment_service_lock = threading.Lock()
 
 
 def get_sentiment_service() -> SentimentService:
     """Return the singleton sentiment service instance."""
     global _sentiment_service
     if _sentiment_service is None:
-        _sentiment_service = SentimentService()
+        with _sentiment_service_lock:
+            if _sentiment_service is None:
+                _sentiment_service = SentimentService()
     return _sentiment_service
@@ -1,13 +1,20 @@
 """
-Speech-to-Text service using OpenAI Whisper.
+Speech-to-Text service using Whisper.
+
+Two backends, selected by STT_PROVIDER:
+  - faster_whisper (default): CTranslate2 kernels with INT8 weights
+  - whisper: the reference OpenAI PyTorch implementation
 
 Provides transcription with timestamp-based pseudo-diarization.
 Designed as a pluggable service: swap to a cloud STT by implementing
 the same interface.
 """
 
+import io
 import os
-import tempfile
+import subprocess
+import threading
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
@@ -19,7 +26,7 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptionSegment:
     """Represents a single transcribed segment."""
     speaker: str
@@ -37,6 +44,61 @@ class TranscriptionResult:
     duration_seconds: Optional[float] = None
 
 
+class TranscriptionStream:
+    """
+    Transcription whose segments are produced as they are decoded.
+
+    Iterate it to receive TranscriptionSegment objects one at a time (with
+    the faster_whisper backend, each is yielded as soon as the decoder emits
+    it); after the iteration, result() returns the same data as
+    STTService.transcribe() would have.
+    """
+
+    def __init__(
+        self,
+        segments: Iterator[TranscriptionSegment],
+        language: Optional[str],
+        full_text: Optional[str] = None,
+    ) -> None:
+        self.language = language
+        self._segments = segments
+        self._full_text = full_text
+        self._consumed: list[TranscriptionSegment] = []
+
+    def __iter__(self) -> Iterator[TranscriptionSegment]:
+        try:
+            for seg in self._segments:
+                self._consumed.append(seg)
+                yield seg
+        except AudioProcessingError:
+            raise
+        except Exception as e:
+            logger.error(f"Transcription failed: {e}", exc_info=True)
+            raise AudioProcessingError(f"Transcription error: {e}") from e
+
+    def result(self) -> TranscriptionResult:
+        """Drain any remaining segments and return the complete result."""
+        for _ in self:
+            pass
+
+        segments = self._consumed
+        # Estimate total duration
+        duration = segments[-1].end_time if segments else 0.0
+        full_text = self._full_text if self._full_text is not None else " ".join(seg.text for seg in segments)
+
+        logger.info(
+            f"Transcription complete: {len(segments)} segments, "
+            f"{duration:.1f}s, language={self.language}"
+        )
+
+        return TranscriptionResult(
+            full_text=full_text,
+            segments=segments,
+            language=self.language,
+            duration_seconds=duration,
+        )
+
+
 class STTService:
     """
     Speech-to-Text service backed by Whisper.
@@ -48,23 +110,60 @@ class STTService:
     def __init__(self) -> None:
         self._model = None
         self._settings = get_settings()
+        self._provider = self._settings.STT_PROVIDER
+        self._load_lock = threading.Lock()
 
     def _load_model(self):
-        """Lazy-load Whisper model."""
+        """Lazy-load the Whisper model for the configured provider."""
         if self._model is not None:
             return
 
+        with self._load_lock:
+            # Another thread may have finished loading while we waited
+            if self._model is None:
+                self._load_model_locked()
+
+    def _load_model_locked(self) -> None:
+        """Load the model; the caller holds _load_lock."""
+        model_size = self._settings.WHISPER_MODEL_SIZE
         try:
-            import whisper  # noqa: local import for lazy loading
+            logger.info(f"Loading Whisper model: {model_size} (provider={self._provider})")
+            if self._provider == "faster_whisper":
+                from faster_whisper import WhisperModel  # noqa: local import for lazy loading
+
+                self._model = WhisperModel(
+                    model_size,
+                    device=self._settings.WHISPER_DEVICE,
+                    compute_type=self._settings.WHISPER_COMPUTE_TYPE,
+                )
+            else:
+                import whisper  # noqa: local import for lazy loading
 
-            model_size = self._settings.WHISPER_MODEL_SIZE
-            logger.info(f"Loading Whisper model: {model_size}")
-            self._model = whisper.load_model(model_size)
+                self._model = whisper.load_model(model_size)
             logger.info(f"Whisper model '{model_size}' loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {e}")
             raise AudioProcessingError(f"STT model initialization failed: {e}") from e
 
+    def warmup(self) -> None:
+        """
+        Load the model and run one inference on a second of silence.
+
+        Pays model load, weight paging and (on GPU) CUDA context setup up
+        front so the first real transcription is not the slow one.
+        """
+        self._load_model()
+
+        import numpy as np  # noqa: local import for lazy loading
+
+        silence = np.zeros(16000, dtype=np.float32)
+        if self._provider == "faster_whisper":
+            segments, _ = self._model.transcribe(silence, language="en")
+            list(segments)  # decoding is lazy; drain the generator
+        else:
+            self._model.transcribe(silence, language="en", verbose=None)
+        logger.info("Whisper model warmed up")
+
     def transcribe(self, audio_path: str | Path) -> TranscriptionResult:
         """
         Transcribe audio file with pseudo-diarization.
@@ -78,42 +177,66 @@ class STTService:
         Raises:
             AudioProcessingError: If transcription fails.
         """
+        return self.transcribe_iter(audio_path).result()
+
+    def transcribe_iter(self, audio_path: str | Path) -> TranscriptionStream:
+        """
+        Start a transcription whose segments are yielded as they are decoded.
+
+        Lets callers hand each segment to the next pipeline stage while the
+        rest of the audio is still being transcribed. The reference whisper
+        backend decodes everything up front, so its stream is only lazy in
+        name.
+
+        Args:
+            audio_path: Path to audio file (WAV/MP3).
+
+        Returns:
+            TranscriptionStream over the speaker-assigned segments.
+
+        Raises:
+            AudioProcessingError: If transcription fails (also raised while
+                iterating the stream).
+        """
         self._load_model()
         audio_path = str(audio_path)
 
         if not os.path.exists(audio_path):
             raise AudioProcessingError(f"Audio file not found: {audio_path}")
 
+        logger.info(f"Starting transcription: {audio_path}")
+        return self._start_stream(audio_path)
+
+    def _start_stream(self, audio) -> TranscriptionStream:
+        """
+        Run the configured backend on ``audio`` and wrap its segments in a stream.
+
+        Args:
+            audio: A file path, a binary file object (faster_whisper), or a
+                16 kHz mono float32 numpy array.
+        """
         try:
-            logger.info(f"Starting transcription: {audio_path}")
+            if self._provider == "faster_whisper":
+                raw_iter, info = self._model.transcribe(
+                    audio,
+                    language=None,  # auto-detect
+                    vad_filter=self._settings.WHISPER_VAD_FILTER,
+                    word_timestamps=False,
+                )
+                # Segments are decoded lazily as the generator is consumed
+                raw_segments = ({"start": seg.start, "end": seg.end, "text": seg.text} for seg in raw_iter)
+                return TranscriptionStream(self._iter_speakers(raw_segments), language=info.language)
 
             result = self._model.transcribe(
-                audio_path,
+                audio,
                 language=None,  # auto-detect
                 verbose=False,
                 word_timestamps=False,
             )
-
-            full_text = result.get("text", "").strip()
-            language = result.get("language", "en")
-            raw_segments = result.get("segments", [])
-
-            # Build diarized segments using timestamp-based speaker assignment
-            segments = self._assign_speakers(raw_segments)
-
-            # Estimate total duration
-            duration = segments[-1].end_time if segments else 0.0
-
-            logger.info(
-                f"Transcription complete: {len(segments)} segments, "
-                f"{duration:.1f}s, language={language}"
-            )
-
-            return TranscriptionResult(
-                full_text=full_text,
-                segments=segments,
-                language=language,
-                duration_seconds=duration,
+            return TranscriptionStream(
+                self._iter_speakers(result.get("segments", [])),
+                language=result.get("language", "en"),
+                full_text=result.get("text", "").strip(),
             )
 
         except AudioProcessingError:
@@ -122,7 +245,7 @@ class STTService:
             logger.error(f"Transcription failed: {e}", exc_info=True)
             raise AudioProcessingError(f"Transcription error: {e}") from e
 
-    def _assign_speakers(self, raw_segments: list[dict]) -> list[TranscriptionSegment]:
+    def _assign_speakers(self, raw_segments: Iterable[dict]) -> list[TranscriptionSegment]:
         """
         Pseudo-diarization: alternate speakers based on silence gaps.
 
@@ -130,66 +253,99 @@ class STTService:
         model for real speaker separation. This heuristic alternates speakers
         when there is a gap > 1.5 seconds between segments.
         """
-        if not raw_segments:
-            return []
+        return list(self._iter_speakers(raw_segments))
 
+    def _iter_speakers(self, raw_segments: Iterable[dict]) -> Iterator[TranscriptionSegment]:
+        """Generator form of _assign_speakers, yielding each segment as it is labelled."""
         SILENCE_GAP_THRESHOLD = 1.5  # seconds
-        segments: list[TranscriptionSegment] = []
+        speakers = ("speaker_0", "speaker_1")
         current_speaker_idx = 0
+        # End of the previous raw segment, empty or not; +inf so the first
+        # segment never counts as a gap
+        prev_end = float("inf")
 
-        for i, seg in enumerate(raw_segments):
+        for seg in raw_segments:
+            seg_prev_end, prev_end = prev_end, float(seg.get("end", 0))
             text = seg.get("text", "").strip()
             if not text:
                 continue
 
             start = float(seg.get("start", 0))
-            end = float(seg.get("end", 0))
 
             # Detect speaker change via gap
-            if i > 0:
-                prev_end = float(raw_segments[i - 1].get("end", 0))
-                if start - prev_end > SILENCE_GAP_THRESHOLD:
-                    current_speaker_idx = 1 - current_speaker_idx  # toggle 0 <-> 1
-
-            segments.append(
-                TranscriptionSegment(
-                    speaker=f"speaker_{current_speaker_idx}",
-                    start_time=round(start, 2),
-                    end_time=round(end, 2),
-                    text=text,
-                )
+            if start - seg_prev_end > SILENCE_GAP_THRESHOLD:
+                current_speaker_idx ^= 1  # toggle 0 <-> 1
+
+            yield TranscriptionSegment(
+                speaker=speakers[current_speaker_idx],
+                start_time=start,
+                end_time=prev_end,
+                text=text,
             )
 
-        return segments
-
     def transcribe_bytes(self, audio_bytes: bytes, suffix: str = ".wav") -> TranscriptionResult:
         """
         Transcribe from raw bytes (convenience for API layer).
 
+        The audio is decoded in memory, without a temporary file:
+        faster_whisper reads it from a BytesIO through PyAV, and the
+        reference whisper backend gets a float32 array from an ffmpeg pipe.
+
         Args:
             audio_bytes: Raw audio file content.
-            suffix: File extension hint.
+            suffix: File extension hint (unused; the container is probed).
 
         Returns:
             TranscriptionResult
         """
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-            tmp.write(audio_bytes)
-            tmp_path = tmp.name
+        self._load_model()
 
-        try:
-            return self.transcribe(tmp_path)
-        finally:
-            os.unlink(tmp_path)
+        if self._provider == "faster_whisper":
+            audio = io.BytesIO(audio_bytes)
+        else:
+            audio = _decode_audio_bytes(audio_bytes)
+
+        logger.info(f"Starting transcription: <{len(audio_bytes)} bytes in memory>")
+        return self._start_stream(audio).result()
+
+
+def _decode_audio_bytes(audio_bytes: bytes, sample_rate: int = 16000):
+    """
+    Decode an audio file held in memory to a mono float32 numpy array.
+
+    Mirrors whisper.load_audio(), but feeds ffmpeg through stdin instead of
+    a file path.
+
+    Raises:
+        AudioProcessingError: If ffmpeg cannot decode the input.
+    """
+    import numpy as np  # noqa: local import for lazy loading
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    try:
+        out = subprocess.run(cmd, input=audio_bytes, capture_output=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", b"") or b""
+        raise AudioProcessingError(f"Failed to decode audio: {stderr.decode(errors='replace') or e}") from e
+
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
 
 
 # ── Module-level singleton ───────────────────────────────────────────────
 _stt_service: Optional[STTService] = None
+_stt_service_lock = threading.Lock()
 
 
 def get_stt_service() -> STTService:
     """Return the singleton STT service instance."""
     global _stt_service
     if _stt_service is None:
-        _stt_service = STTService()
+        with _stt_service_lock:
+            if _stt_service is None:
+                _stt_service = STTService()
     return _stt_service
@@ -5,18 +5,26 @@ Currently supports gTTS (Google Text-to-Speech) as the default provider.
 Designed for easy swap to other engines (pyttsx3, Coqui, ElevenLabs, etc.).
 """
 
+import hashlib
+import io
 import os
-import tempfile
+import re
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from app.core.config import get_settings
 from app.core.exceptions import TTSError
 from app.core.logging import get_logger
+from app.services.cache_service import get_cache_service
 
 logger = get_logger(__name__)
 
+# Sentence boundaries used to split long texts into independent gTTS requests
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
 
 class TTSService:
     """
@@ -27,6 +35,53 @@ class TTSService:
 
     def __init__(self) -> None:
         self._settings = get_settings()
+        self._cache = get_cache_service()
+
+    def warmup(self) -> None:
+        """
+        Import the configured provider's library ahead of the first request.
+
+        Later imports inside the synthesize helpers are then plain
+        sys.modules lookups.
+        """
+        if self._settings.TTS_PROVIDER == "gtts":
+            import gtts  # noqa: F401, local import for lazy loading
+        else:
+            import pyttsx3  # noqa: F401, local import for lazy loading
+        logger.info(f"TTS provider '{self._settings.TTS_PROVIDER}' loaded")
+
+    def cache_key(self, text: str, language: str = "en") -> str:
+        """Versioned cache key for a (provider, language, text) synthesis."""
+        digest = hashlib.sha256(f"{self._settings.TTS_PROVIDER}:{language}:{text}".encode()).hexdigest()
+        return f"tts:v1:{digest}"
+
+    def synthesize_cached(self, text: str, language: str = "en") -> str:
+        """
+        Synthesize text, reusing a previously generated file when possible.
+
+        Output paths are cached in Redis by content hash, so repeated phrases
+        skip the TTS round trip entirely. A cached path whose file has been
+        removed is treated as a miss.
+
+        Args:
+            text: Text content to synthesize.
+            language: BCP-47 language code.
+
+        Returns:
+            Absolute path to the audio file.
+
+        Raises:
+            TTSError: If synthesis fails.
+        """
+        key = self.cache_key(text, language)
+        cached_path = self._cache.get(key)
+        if cached_path and os.path.exists(cached_path):
+            logger.info(f"TTS cache hit: {cached_path}")
+            return cached_path
+
+        output_path = self.synthesize(text=text, language=language)
+        self._cache.set(key, output_path, ttl=self._settings.TTS_CACHE_TTL_SECONDS)
+        return output_path
 
     def synthesize(self, text: str, language: str = "en", output_dir: str | Path | None = None) -> str:
         """
@@ -63,17 +118,41 @@ class TTSService:
             raise TTSError(f"TTS error: {e}") from e
 
     def _synthesize_gtts(self, text: str, language: str, output_dir: str | Path | None) -> str:
-        """Google TTS synthesis."""
-        from gtts import gTTS
+        """
+        Google TTS synthesis.
 
+        gTTS sends one HTTP request per ~100 characters, one after another.
+        Multi-sentence texts are split on sentence boundaries and the
+        sentences are fetched concurrently; MP3 streams concatenate
+        byte-wise, so the parts are joined in order and written once.
+        """
         output_path = self._get_output_path(output_dir, extension=".mp3")
 
-        tts = gTTS(text=text, lang=language, slow=False)
-        tts.save(output_path)
+        sentences = [s for s in _SENTENCE_SPLIT_RE.split(text.strip()) if s]
+        max_workers = min(len(sentences), self._settings.TTS_MAX_CONCURRENCY)
+        if max_workers > 1:
+            # Scoped to this call, so no threads outlive the request; starting
+            # a few is cheap next to the HTTP round trips they overlap
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gtts") as executor:
+                parts = list(executor.map(lambda s: self._gtts_bytes(s, language), sentences))
+        else:
+            parts = [self._gtts_bytes(text, language)]
+
+        with open(output_path, "wb") as f:
+            f.writelines(parts)
 
         logger.info(f"gTTS audio saved: {output_path}")
         return output_path
 
+    @staticmethod
+    def _gtts_bytes(text: str, language: str) -> bytes:
+        """Fetch the MP3 audio for ``text`` from Google TTS."""
+        from gtts import gTTS
+
+        buf = io.BytesIO()
+        gTTS(text=text, lang=language, slow=False).write_to_fp(buf)
+        return buf.getvalue()
+
     def _synthesize_pyttsx3(self, text: str, output_dir: str | Path | None) -> str:
         """pyttsx3 local TTS synthesis."""
         import pyttsx3
@@ -102,11 +181,14 @@ class TTSService:
 
 # ── Module-level singleton ───────────────────────────────────────────────
 _tts_service: Optional[TTSService] = None
+_tts_service_lock = threading.Lock()
 
 
 def get_tts_service() -> TTSService:
     """Return the singleton TTS service instance."""
     global _tts_service
     if _tts_service is None:
-        _tts_service = TTSService()
+        with _tts_service_lock:
+            if _tts_service is None:
+                _tts_service = TTSService()
     return _tts_service
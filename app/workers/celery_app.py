@@ -0,0 +1,119 @@
+"""
+Celery application instance.
+
+Broker and result backend are taken from CELERY_BROKER_URL and
+CELERY_RESULT_BACKEND (Redis by default).
+
+Workers use the prefork pool: each child process runs one transcription at
+a time with its own preloaded models, so concurrent calls run on separate
+cores instead of contending for one interpreter's GIL.
+
+Run a worker with:
+    celery -A app.workers.celery_app worker --loglevel=info
+"""
+
+import os
+
+from celery import Celery
+from celery.signals import worker_process_init
+
+from app.core.config import get_settings
+from app.core.logging import get_logger, setup_logging
+
+settings = get_settings()
+
+# Task names, so producers can enqueue by name without importing the
+# pipeline (and its ML service modules)
+PROCESS_TRANSCRIPTION_TASK = "app.workers.tasks.process_transcription_task"
+
+# Keep the JSON log format in worker processes too
+setup_logging()
+logger = get_logger(__name__)
+
+celery_app = Celery(
+    "darwix",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.workers.tasks"],
+)
+
+
+def _worker_concurrency() -> int:
+    """Prefork child count: explicit setting, else one child per TORCH_NUM_THREADS cores."""
+    if settings.CELERY_WORKER_CONCURRENCY > 0:
+        return settings.CELERY_WORKER_CONCURRENCY
+    cores = os.cpu_count() or 1
+    return max(1, cores // max(1, settings.TORCH_NUM_THREADS))
+
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_track_started=True,
+    worker_hijack_root_logger=False,
+    worker_pool="prefork",
+    worker_concurrency=_worker_concurrency(),
+    # Transcriptions take seconds to minutes: reserve one at a time so an
+    # idle child is never stuck behind a busy sibling's prefetched queue,
+    # and only ack once done so a crashed child's task is redelivered.
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+)
+
+
+@worker_process_init.connect
+def _init_worker_process(**_) -> None:
+    """Per-process setup for each prefork child: thread pinning, then model warmup."""
+    _pin_torch_threads()
+    _preload_models()
+
+
+def _pin_torch_threads() -> None:
+    """
+    Limit PyTorch's intra-op threads in this worker process.
+
+    Each prefork child is its own inference instance; letting every one of
+    them spread a single op across all cores oversubscribes the CPU and
+    thrashes caches. Size TORCH_NUM_THREADS x worker concurrency to the
+    core count.
+    """
+    if settings.TORCH_NUM_THREADS <= 0:
+        return
+    try:
+        import torch  # noqa: local import for lazy loading
+    except ImportError:
+        return
+
+    torch.set_num_threads(settings.TORCH_NUM_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only settable before the first parallel op in the process
+        pass
+    logger.info(f"Torch threads pinned to {settings.TORCH_NUM_THREADS}")
+
+
+def _preload_models() -> None:
+    """
+    Create the pipeline services and warm up their models in each worker process.
+
+    The API never runs inference, so this is where the first-task model
+    load is paid instead. Failures are logged; the services still load
+    lazily on first use.
+    """
+    if not settings.PRELOAD_MODELS:
+        return
+
+    from app.services.coachable_service import get_coachable_service  # noqa: local import for lazy loading
+    from app.services.sentiment_service import get_sentiment_service  # noqa: local import for lazy loading
+    from app.services.stt_service import get_stt_service  # noqa: local import for lazy loading
+
+    try:
+        get_coachable_service()
+        get_stt_service().warmup()
+        if settings.SENTIMENT_ENABLED:
+            get_sentiment_service().warmup()
+    except Exception as e:
+        logger.warning(f"Model preload failed, falling back to lazy loading: {e}")
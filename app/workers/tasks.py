@@ -1,28 +1,40 @@
 """
-Background task processing stubs.
+Background task processing.
 
-This module provides the architecture for async task processing.
-Currently uses FastAPI BackgroundTasks; designed for migration to Celery.
+The /transcribe endpoint enqueues process_transcription_task on the Celery
+broker and returns immediately; a worker process runs the full pipeline.
 
-Production migration path:
-    1. Install Celery + Redis/RabbitMQ
-    2. Replace function calls with .delay() invocations
-    3. Run worker: celery -A app.workers.tasks worker --loglevel=info
+Run a worker with:
+    celery -A app.workers.celery_app worker --loglevel=info
 """
 
+from dataclasses import dataclass
 from typing import Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.core.logging import get_logger
 from app.db.models import Call, Segment, Transcript
-from app.services.coachable_service import CoachableDetectionService
-from app.services.sentiment_service import SentimentResult, SentimentService
-from app.services.stt_service import STTService, TranscriptionResult
+from app.db.session import SessionLocal
+from app.services.coachable_service import CoachableDetectionService, get_coachable_service
+from app.services.sentiment_service import SentimentResult, SentimentService, get_sentiment_service
+from app.services.stt_service import STTService, TranscriptionResult, get_stt_service
+from app.workers.celery_app import PROCESS_TRANSCRIPTION_TASK, celery_app
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class ProcessingResult:
+    """Outcome of the transcription pipeline, including the persisted segments."""
+    full_text: str
+    segments: list[Segment]
+    language: Optional[str] = None
+    duration_seconds: Optional[float] = None
+
+
 def process_transcription(
     call_id: str,
     audio_path: str,
@@ -31,14 +43,15 @@ def process_transcription(
     sentiment_service: Optional[SentimentService] = None,
     coachable_service: Optional[CoachableDetectionService] = None,
     sentiment_enabled: bool = True,
-) -> TranscriptionResult:
+) -> ProcessingResult:
     """
     Full transcription pipeline: STT → Sentiment → Coachable Detection → DB persist.
 
-    In a Celery-based setup, this function becomes the task body:
-        @celery_app.task(bind=True, max_retries=3)
-        def process_transcription_task(self, call_id, audio_path):
-            ...
+    STT and sentiment overlap: segments are submitted to the sentiment
+    batcher while the rest of the audio is still being transcribed.
+
+    This is the body of process_transcription_task; it takes its session and
+    services as arguments so it can be exercised directly in tests.
 
     Args:
         call_id: Call identifier.
@@ -50,106 +63,181 @@ def process_transcription(
         sentiment_enabled: Whether to run sentiment analysis.
 
     Returns:
-        TranscriptionResult from STT.
+        ProcessingResult with the transcript metadata and the Segment rows
+        that were persisted, so callers don't need to re-query them.
     """
-    # Update call status
     call = db.query(Call).filter(Call.call_id == call_id).first()
+
+    # With acks_late a task can be redelivered after it already committed
+    # (worker lost between commit and ack); its results are final, so
+    # return them rather than transcribing and inserting a second copy.
+    if call and call.status == "completed":
+        logger.info(f"[{call_id}] Already completed; skipping redelivered task")
+        transcript = call.transcript
+        return ProcessingResult(
+            full_text=transcript.full_text if transcript else "",
+            segments=list(call.segments),
+            language=transcript.language if transcript else None,
+            duration_seconds=transcript.duration_seconds if transcript else None,
+        )
+
+    # Update call status
     if call:
         call.status = "processing"
         db.commit()
 
     try:
-        # ── Step 1: Transcribe ───────────────────────────────────────
-        result = stt_service.transcribe(audio_path)
+        # ── Steps 1–2: Transcribe, streaming segments into sentiment ──
+        # Each segment is queued on the sentiment micro-batcher as soon as
+        # the decoder emits it, so classification of earlier segments
+        # overlaps with transcription of the rest of the audio.
+        stream = stt_service.transcribe_iter(audio_path)
+        run_sentiment = sentiment_enabled and sentiment_service is not None
+        futures = []
+        for seg in stream:
+            if run_sentiment:
+                try:
+                    futures.append(sentiment_service.submit(seg.text))
+                except Exception as e:
+                    logger.warning(f"[{call_id}] Sentiment analysis failed (non-fatal): {e}")
+                    run_sentiment = False
+        result = stream.result()
         logger.info(f"[{call_id}] Transcription complete: {len(result.segments)} segments")
 
-        # ── Step 2: Sentiment Analysis ───────────────────────────────
-        sentiment_results: list[Optional[SentimentResult]] = []
-        if sentiment_enabled and sentiment_service and result.segments:
+        sentiment_results: list[Optional[SentimentResult]] = [None] * len(result.segments)
+        if run_sentiment and futures:
             try:
-                texts = [seg.text for seg in result.segments]
-                sentiment_results = sentiment_service.analyze_batch(texts)
+                sentiment_results = [f.result() for f in futures]
                 logger.info(f"[{call_id}] Sentiment analysis complete")
             except Exception as e:
                 logger.warning(f"[{call_id}] Sentiment analysis failed (non-fatal): {e}")
-                sentiment_results = [None] * len(result.segments)
-        else:
-            sentiment_results = [None] * len(result.segments)
 
         # ── Step 3: Coachable Moment Detection ───────────────────────
         coachable_moments = []
         if coachable_service and result.segments:
             try:
-                sentiment_dicts = [
-                    {"label": s.label, "score": s.score} if s else None
-                    for s in sentiment_results
-                ]
-                coachable_moments = coachable_service.detect(result.segments, sentiment_dicts)
+                coachable_moments = coachable_service.detect(result.segments, sentiment_results)
                 logger.info(f"[{call_id}] Coachable moments: {len(coachable_moments)}")
             except Exception as e:
                 logger.warning(f"[{call_id}] Coachable detection failed (non-fatal): {e}")
 
         # ── Step 4: Persist to Database ──────────────────────────────
-        _persist_results(
+        # Transcript, segments and the status change go out in one
+        # transaction: a single fsync, and readers never see a completed
+        # call without its segments.
+        segments_db = _persist_results(
             db=db,
             call_id=call_id,
             result=result,
             sentiment_results=sentiment_results,
             coachable_moments=coachable_moments,
         )
-
-        # Update call status
         if call:
             call.status = "completed"
-            db.commit()
+        db.commit()
+        logger.info(f"[{call_id}] Results persisted: transcript + {len(segments_db)} segments")
 
-        return result
+        return ProcessingResult(
+            full_text=result.full_text,
+            segments=segments_db,
+            language=result.language,
+            duration_seconds=result.duration_seconds,
+        )
 
     except Exception as e:
         logger.error(f"[{call_id}] Processing failed: {e}", exc_info=True)
+        db.rollback()
         if call:
             call.status = "failed"
             db.commit()
         raise
 
 
+@celery_app.task(name=PROCESS_TRANSCRIPTION_TASK)
+def process_transcription_task(call_id: str, audio_path: str) -> dict:
+    """
+    Celery entry point for the transcription pipeline.
+
+    Opens its own database session and resolves the service singletons
+    inside the worker process.
+
+    Args:
+        call_id: Call identifier (the Call row must already exist).
+        audio_path: Path to the uploaded audio file.
+
+    Returns:
+        Small JSON-serializable summary stored in the result backend.
+    """
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        result = process_transcription(
+            call_id=call_id,
+            audio_path=audio_path,
+            db=db,
+            stt_service=get_stt_service(),
+            sentiment_service=get_sentiment_service() if settings.SENTIMENT_ENABLED else None,
+            coachable_service=get_coachable_service(),
+            sentiment_enabled=settings.SENTIMENT_ENABLED,
+        )
+        return {"call_id": call_id, "status": "completed", "segments": len(result.segments)}
+    finally:
+        db.close()
+
+
 def _persist_results(
     db: Session,
     call_id: str,
     result: TranscriptionResult,
     sentiment_results: list[Optional[SentimentResult]],
     coachable_moments: list,
-) -> None:
-    """Persist transcription results to the database."""
+) -> list[Segment]:
+    """
+    Insert the transcript and segments and return the segments.
+
+    Segments go out as one multi-row INSERT ... RETURNING rather than
+    through the unit of work, so a long call costs a single batched
+    statement instead of per-object flush bookkeeping.
+
+    Nothing is committed here; the caller commits once, together with the
+    call status update.
+    """
     # Build coachable index for quick lookup
     coachable_index = {m.segment_index: m for m in coachable_moments}
 
     # Save transcript
-    transcript = Transcript(
-        call_id=call_id,
-        full_text=result.full_text,
-        language=result.language,
-        duration_seconds=result.duration_seconds,
+    db.execute(
+        insert(Transcript).values(
+            call_id=call_id,
+            full_text=result.full_text,
+            language=result.language,
+            duration_seconds=result.duration_seconds,
+        )
     )
-    db.add(transcript)
 
     # Save segments
+    rows: list[dict] = []
     for i, seg in enumerate(result.segments):
         sentiment = sentiment_results[i] if i < len(sentiment_results) else None
         coachable = coachable_index.get(i)
 
-        segment = Segment(
-            call_id=call_id,
-            speaker=seg.speaker,
-            start_time=seg.start_time,
-            end_time=seg.end_time,
-            text=seg.text,
-            sentiment=sentiment.label if sentiment else None,
-            sentiment_score=sentiment.score if sentiment else None,
-            is_coachable=1 if coachable else 0,
-            coachable_type=coachable.coachable_type if coachable else None,
-        )
-        db.add(segment)
-
-    db.commit()
-    logger.info(f"[{call_id}] Results persisted: transcript + {len(result.segments)} segments")
+        rows.append({
+            "call_id": call_id,
+            "speaker": seg.speaker,
+            "start_time": seg.start_time,
+            "end_time": seg.end_time,
+            "text": seg.text,
+            "sentiment": sentiment.label if sentiment else None,
+            "sentiment_score": sentiment.score if sentiment else None,
+            "is_coachable": 1 if coachable else 0,
+            "coachable_type": coachable.coachable_type if coachable else None,
+        })
+
+    # An executemany with no parameter sets would insert one all-defaults row
+    if not rows:
+        return []
+    # sort_by_parameter_order would make SQLite fall back to one INSERT per
+    # row (it has no sentinel column); ids are assigned in parameter order
+    # within the statement, so sorting on them restores segment order.
+    inserted = db.scalars(insert(Segment).returning(Segment), rows).all()
+    return sorted(inserted, key=lambda s: s.id)
@@ -25,16 +25,25 @@ interface CallAnalysisProps {
     onBack: () => void;
 }
 
+const PENDING_STATUSES = ['pending', 'queued', 'processing'];
+const POLL_INTERVAL_MS = 3000;
+
 const CallAnalysis: React.FC<CallAnalysisProps> = ({ callId, onBack }) => {
     const [callData, setCallData] = useState<CallDetail | null>(null);
     const [isLoading, setIsLoading] = useState(true);
     const [isReplaying, setIsReplaying] = useState(false);
 
     useEffect(() => {
+        let pollTimer: ReturnType<typeof setTimeout> | undefined;
+
         const fetchCallDetail = async () => {
             try {
                 const response = await axios.get(`/api/calls/${callId}`);
                 setCallData(response.data);
+                // Transcription runs on a background worker; poll until it settles
+                if (PENDING_STATUSES.includes(response.data.status)) {
+                    pollTimer = setTimeout(fetchCallDetail, POLL_INTERVAL_MS);
+                }
             } catch (error) {
                 console.error('Failed to fetch call details:', error);
             } finally {
@@ -42,6 +51,8 @@ const CallAnalysis: React.FC<CallAnalysisProps> = ({ callId, onBack }) => {
             }
         };
         fetchCallDetail();
+
+        return () => clearTimeout(pollTimer);
     }, [callId]);
 
     const handleReplay = async () => {
@@ -5,23 +5,91 @@ Pytest configuration and shared fixtures.
 import os
 import tempfile
 
+# Tests never talk to Redis; must be set before app settings are loaded
+os.environ.setdefault("CACHE_ENABLED", "false")
+# The app lifespan (entered by the API tests' TestClient) creates tables on
+# the app's own engine; keep that database out of the working tree
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/app.db")
+# /transcribe stores uploads for a worker that never runs under test; keep
+# them out of the working tree too
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp())
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.db.models import Base
 
+# Setup budget for tests marked "fast"; a slower setup means some fixture or
+# import has grown expensive and would tax every test that uses it
+FAST_SETUP_BUDGET_SECONDS = 0.1
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Fail a "fast" test whose setup phase exceeds FAST_SETUP_BUDGET_SECONDS."""
+    outcome = yield
+    report = outcome.get_result()
+    if (
+        call.when == "setup"
+        and report.passed
+        and item.get_closest_marker("fast")
+        and call.duration > FAST_SETUP_BUDGET_SECONDS
+    ):
+        report.outcome = "failed"
+        report.longrepr = (
+            f"setup took {call.duration * 1000:.0f} ms, over the "
+            f"{FAST_SETUP_BUDGET_SECONDS * 1000:.0f} ms budget for fast tests"
+        )
+
+
+@pytest.fixture(scope="session")
+def worker_id():
+    """
+    The pytest-xdist worker running this session ("master" without xdist).
+
+    Mirrors the fixture pytest-xdist provides, so the suite also runs when
+    the plugin is not installed.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
 
 @pytest.fixture(scope="session")
-def db_engine():
-    """Create an in-memory SQLite engine for testing."""
-    engine = create_engine("sqlite:///:memory:", echo=False)
+def db_engine(worker_id):
+    """
+    Create an in-memory SQLite engine for testing.
+
+    A named shared-cache memory database lets every pooled connection (from
+    any thread) see the same data, unlike ``:memory:``, which is private to
+    one connection. The database lives only while a connection is open, so
+    one is held for the whole session. The name carries the xdist worker id
+    so parallel workers never share a database.
+    """
+    engine = create_engine(
+        f"sqlite+pysqlite:///file:testdb_{worker_id}?mode=memory&cache=shared&uri=true",
+        echo=False,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=5,
+    )
+    keepalive = engine.connect()
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
+    keepalive.close()
     engine.dispose()
 
 
+@pytest.fixture(autouse=True)
+def no_leaked_connections(request):
+    """Fail a test that leaves a db_engine connection checked out (beyond the keepalive)."""
+    yield
+    if "db_engine" in request.fixturenames:
+        engine = request.getfixturevalue("db_engine")
+        assert engine.pool.checkedout() == 1, "test leaked a database connection"
+
+
 @pytest.fixture
 def db_session(db_engine):
     """Provide a fresh database session per test."""
@@ -32,9 +100,13 @@ def db_session(db_engine):
     session.close()
 
 
-@pytest.fixture
-def temp_audio_file():
-    """Create a temporary audio file for testing."""
+@pytest.fixture(scope="session")
+def temp_audio_file(tmp_path_factory):
+    """
+    Create a temporary audio file for testing.
+
+    Shared by the whole session: tests only read it.
+    """
     # Create a minimal WAV file (44-byte header + silence)
     wav_header = bytearray(44)
     wav_header[0:4] = b"RIFF"
@@ -56,9 +128,6 @@ def temp_audio_file():
     file_size = len(wav_header) + data_size - 8
     wav_header[4:8] = file_size.to_bytes(4, "little")
 
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-        f.write(bytes(wav_header) + silence)
-        path = f.name
-
-    yield path
-    os.unlink(path)
+    path = tmp_path_factory.mktemp("audio") / "test.wav"
+    path.write_bytes(bytes(wav_header) + silence)
+    return str(path)
@@ -5,60 +5,172 @@ Tests the FastAPI endpoints using TestClient with mocked ML services.
 """
 
 import json
-from unittest.mock import MagicMock, patch
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_scoped_session, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
+from app.api import routes
 from app.db.models import Base, Call, Segment, Transcript
 from app.db.session import get_db
 from app.main import app
+from app.workers.celery_app import PROCESS_TRANSCRIPTION_TASK
 
 
 # ── Test DB Setup ────────────────────────────────────────────────────────
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-
-# Use StaticPool + check_same_thread=False to avoid SQLite threading issues
-# with FastAPI's async TestClient
-test_engine = create_engine(
-    "sqlite:///:memory:",
-    echo=False,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestSession = sessionmaker(bind=test_engine)
-
-
-def override_get_db():
-    """Override DB dependency for tests."""
-    db = TestSession()
+# The app reads through an aiosqlite engine while tests seed and inspect the
+# same file through a sync engine. NullPool because TestClient may run each
+# request on a fresh event loop, and aiosqlite connections are loop-bound.
+# mkdtemp gives every process, and so every xdist worker, its own file.
+_test_db_path = Path(tempfile.mkdtemp()) / "test_api.db"
+test_engine = create_engine(f"sqlite:///{_test_db_path}", echo=False)
+test_async_engine = create_async_engine(f"sqlite+aiosqlite:///{_test_db_path}", poolclass=NullPool)
+TestSession = sessionmaker(bind=test_engine, expire_on_commit=False)
+AsyncTestSession = async_sessionmaker(bind=test_async_engine, expire_on_commit=False)
+
+# One AsyncSession per test, shared by every request that test makes, so a
+# read-only test opens one aiosqlite connection rather than one per request.
+# The scope is advanced by the scoped_db_session fixture.
+_session_scope = [0]
+AsyncScopedSession = async_scoped_session(AsyncTestSession, scopefunc=lambda: _session_scope[0])
+
+
+async def override_get_db():
+    """Override DB dependency for tests with the current test's session."""
+    db = AsyncScopedSession()
     try:
         yield db
     finally:
-        db.close()
-
+        # Rows seeded between requests must not be shadowed by stale objects
+        db.expunge_all()
 
-app.dependency_overrides[get_db] = override_get_db
 
-
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def setup_db():
-    """Create tables before each test, drop after."""
+    """Create tables once for the session, drop them at the end."""
     Base.metadata.create_all(bind=test_engine)
     yield
     Base.metadata.drop_all(bind=test_engine)
 
 
-client = TestClient(app)
+@pytest.fixture(autouse=True)
+def clean_tables():
+    """
+    Empty every table after each test.
+
+    The app reads through its own aiosqlite connections, so seeded rows
+    must be committed to be visible and cannot be isolated by rolling back
+    an outer transaction; a DELETE per table is still far cheaper than
+    re-running the DDL.
+    """
+    yield
+    # A session left open by the test would hold a connection (and its locks)
+    assert test_engine.pool.checkedout() == 0, "test leaked a database connection"
+    with test_engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient, and so one app lifespan, shared by the whole session."""
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def scoped_db_session(client, clean_tables):
+    """Give each test its own request session and close it before the tables are emptied."""
+    _session_scope[0] += 1
+    yield
+    # The session's connection belongs to the client's event loop
+    client.portal.call(AsyncScopedSession.remove)
+
+
+@pytest.fixture
+def mock_celery(monkeypatch):
+    """Celery app the routes enqueue transcriptions on."""
+    celery = MagicMock()
+    monkeypatch.setattr("app.api.routes.celery_app", celery)
+    return celery
+
+
+@pytest.fixture
+def mock_tts(monkeypatch):
+    """TTS service instance handed out by get_tts_service in the routes."""
+    tts = MagicMock()
+    monkeypatch.setattr("app.api.routes.get_tts_service", lambda: tts)
+    return tts
+
+
+@pytest.fixture
+def mock_cache(monkeypatch):
+    """Cache service instance handed out by get_cache_service in the routes; starts empty."""
+    cache = MagicMock()
+    cache.get.return_value = None
+    monkeypatch.setattr("app.api.routes.get_cache_service", lambda: cache)
+    return cache
+
+
+_MULTIPART_BOUNDARY = "darwix-test-boundary"
+
+
+@pytest.fixture(scope="session")
+def audio_part(temp_audio_file):
+    """The test WAV encoded once as the "audio" part of a multipart body."""
+    head = (
+        f"--{_MULTIPART_BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="audio"; filename="test.wav"\r\n'
+        "Content-Type: audio/wav\r\n\r\n"
+    ).encode()
+    return head + Path(temp_audio_file).read_bytes() + b"\r\n"
+
+
+def post_transcribe(client, audio_part: bytes, **fields: str):
+    """POST /transcribe with a raw multipart body built around a pre-encoded audio part."""
+    form = b"".join(
+        f'--{_MULTIPART_BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    )
+    body = form + audio_part + f"--{_MULTIPART_BOUNDARY}--\r\n".encode()
+    return client.post(
+        "/transcribe",
+        content=body,
+        headers={"content-type": f"multipart/form-data; boundary={_MULTIPART_BOUNDARY}"},
+    )
+
+
+@contextmanager
+def count_queries(engine):
+    """Count SQL statements executed on ``engine`` inside the block."""
+    statements: list[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
 
 
 # ── Health Check ─────────────────────────────────────────────────────────
 
 class TestHealthEndpoint:
-    def test_health_check(self):
+    def test_health_check(self, client):
         """Health endpoint returns 200 with status."""
         response = client.get("/health")
         assert response.status_code == 200
@@ -67,53 +179,157 @@ class TestHealthEndpoint:
         assert "version" in data
         assert "timestamp" in data
 
+    def test_app_import_skips_ml_modules(self):
+        """Importing the API loads neither the ML libraries nor the pipeline services."""
+        heavy = [
+            "whisper", "transformers", "torch",
+            "app.services.stt_service", "app.services.sentiment_service", "app.workers.tasks",
+        ]
+        code = f"import sys, app.main; print([m for m in {heavy!r} if m in sys.modules])"
+
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
 
-# ── Transcribe Endpoint ─────────────────────────────────────────────────
+        assert result.stdout.strip().splitlines()[-1] == "[]"
 
-class TestTranscribeEndpoint:
 
-    @patch("app.api.routes.get_stt_service")
-    @patch("app.api.routes.get_sentiment_service")
-    @patch("app.api.routes.get_coachable_service")
-    def test_transcribe_success(self, mock_coachable, mock_sentiment, mock_stt, temp_audio_file):
-        """Successful transcription returns structured JSON."""
-        from app.services.stt_service import TranscriptionResult, TranscriptionSegment
-
-        # Mock STT
-        mock_stt_instance = MagicMock()
-        mock_stt_instance.transcribe.return_value = TranscriptionResult(
-            full_text="Hello, I'm interested in your product.",
-            segments=[
-                TranscriptionSegment(speaker="speaker_0", start_time=0.0, end_time=3.0, text="Hello, I'm interested in your product."),
-            ],
-            language="en",
-            duration_seconds=3.0,
-        )
-        mock_stt.return_value = mock_stt_instance
+# ── Calls Endpoints ─────────────────────────────────────────────────────
+
+class TestCallsEndpoint:
+
+    def _seed_call(self, call_id: str) -> None:
+        db = TestSession()
+        db.add(Call(call_id=call_id, status="completed", agent_id="agent_001"))
+        db.add(Transcript(call_id=call_id, full_text="Hello there. Too expensive."))
+        db.add_all([
+            Segment(call_id=call_id, speaker="speaker_1", start_time=2.0, end_time=4.0,
+                    text="Too expensive.", is_coachable=1, coachable_type="objection"),
+            Segment(call_id=call_id, speaker="speaker_0", start_time=0.0, end_time=1.5, text="Hello there."),
+        ])
+        db.commit()
+        db.close()
 
-        # Mock Sentiment (disabled path)
-        mock_sentiment.return_value = None
+    def test_list_calls(self, client):
+        """Recent calls are listed."""
+        self._seed_call("test_list_001")
 
-        # Mock Coachable
-        mock_coachable_instance = MagicMock()
-        mock_coachable_instance.detect.return_value = []
-        mock_coachable.return_value = mock_coachable_instance
+        response = client.get("/calls")
+
+        assert response.status_code == 200
+        assert [c["call_id"] for c in response.json()] == ["test_list_001"]
 
-        with open(temp_audio_file, "rb") as f:
-            response = client.post(
-                "/transcribe",
-                files={"audio": ("test.wav", f, "audio/wav")},
-                data={"agent_id": "agent_001", "customer_id": "cust_001"},
-            )
+    def test_get_call_detail(self, client):
+        """Call detail includes transcript and segments ordered by start time."""
+        self._seed_call("test_detail_001")
+
+        response = client.get("/calls/test_detail_001")
 
         assert response.status_code == 200
         data = response.json()
+        assert data["transcript"] == "Hello there. Too expensive."
+        assert [s["start_time"] for s in data["segments"]] == [0.0, 2.0]
+        assert data["segments"][1]["is_coachable"] is True
+
+    def test_get_call_detail_query_count(self, client):
+        """Call detail loads call, transcript and segments without per-table queries."""
+        self._seed_call("test_detail_002")
+
+        with count_queries(test_async_engine.sync_engine) as statements:
+            response = client.get("/calls/test_detail_002")
+
+        assert response.status_code == 200
+        # One joined SELECT for call + transcript, one selectin SELECT for segments
+        assert len(statements) <= 2
+
+    def test_get_call_detail_etag_not_modified(self, client):
+        """A matching If-None-Match returns 304 with no body."""
+        self._seed_call("test_detail_003")
+
+        first = client.get("/calls/test_detail_003")
+        etag = first.headers["etag"]
+        second = client.get("/calls/test_detail_003", headers={"If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert second.content == b""
+
+    def test_get_call_detail_cached(self, mock_cache, client):
+        """Completed calls are cached and later served without touching the DB."""
+        self._seed_call("test_detail_004")
+
+        response = client.get("/calls/test_detail_004")
+
+        key, payload = mock_cache.set.call_args.args
+        assert key == "call:v1:test_detail_004"
+        assert json.loads(payload) == response.json()
+
+        mock_cache.get.return_value = payload
+        with count_queries(test_async_engine.sync_engine) as statements:
+            cached = client.get("/calls/test_detail_004")
+
+        assert cached.status_code == 200
+        assert cached.json() == response.json()
+        assert statements == []
+
+    def test_get_call_detail_not_found(self, client):
+        """Unknown call returns 404."""
+        response = client.get("/calls/nonexistent_id")
+        assert response.status_code == 404
+
+
+# ── Transcribe Endpoint ─────────────────────────────────────────────────
+
+@pytest.mark.integration
+class TestTranscribeEndpoint:
+
+    def test_transcribe_success(self, mock_celery, audio_part, client):
+        """Upload is stored and queued for processing with 202 Accepted."""
+        response = post_transcribe(client, audio_part, agent_id="agent_001", customer_id="cust_001")
+
+        assert response.status_code == 202
+        data = response.json()
         assert "call_id" in data
-        assert data["status"] == "completed"
-        assert "transcript" in data
-        assert "segments" in data
+        assert data["status"] == "queued"
+        assert data["segments"] == []
+
+        mock_celery.send_task.assert_called_once()
+        assert mock_celery.send_task.call_args.args[0] == PROCESS_TRANSCRIPTION_TASK
+        assert mock_celery.send_task.call_args.kwargs["kwargs"]["call_id"] == data["call_id"]
+
+        db = TestSession()
+        call = db.query(Call).filter(Call.call_id == data["call_id"]).first()
+        db.close()
+        assert call.status == "queued"
+        assert call.agent_id == "agent_001"
+
+    def test_transcribe_queue_unavailable(self, mock_celery, audio_part, client):
+        """Broker failure marks the call failed and returns 503."""
+        mock_celery.send_task.side_effect = ConnectionError("broker down")
+
+        response = post_transcribe(client, audio_part, call_id="queue_down_001")
+
+        assert response.status_code == 503
+
+        db = TestSession()
+        call = db.query(Call).filter(Call.call_id == "queue_down_001").first()
+        db.close()
+        assert call.status == "failed"
+
+    def test_transcribe_file_too_large(self, monkeypatch, audio_part, client):
+        """Uploads over MAX_UPLOAD_SIZE_MB return 413 and leave no partial file."""
+        monkeypatch.setattr(routes.settings, "MAX_UPLOAD_SIZE_MB", 0)
+
+        response = post_transcribe(client, audio_part, call_id="too_large_001")
 
-    def test_transcribe_no_file(self):
+        assert response.status_code == 413
+        assert not (routes.settings.upload_path / "too_large_001.wav").exists()
+
+    def test_transcribe_no_file(self, client):
         """Missing audio file returns 422."""
         response = client.post("/transcribe")
         assert response.status_code == 422
@@ -123,16 +339,13 @@ class TestTranscribeEndpoint:
 
 class TestSpeakEndpoint:
 
-    @patch("app.api.routes.get_tts_service")
-    def test_speak_success(self, mock_tts, tmp_path):
+    def test_speak_success(self, mock_tts, tmp_path, client):
         """Successful TTS returns audio file."""
         # Create a dummy audio file
         dummy_audio = tmp_path / "test_output.mp3"
         dummy_audio.write_bytes(b"\x00" * 100)
 
-        mock_tts_instance = MagicMock()
-        mock_tts_instance.synthesize.return_value = str(dummy_audio)
-        mock_tts.return_value = mock_tts_instance
+        mock_tts.synthesize_cached.return_value = str(dummy_audio)
 
         response = client.post(
             "/speak",
@@ -141,8 +354,10 @@ class TestSpeakEndpoint:
 
         assert response.status_code == 200
         assert "audio" in response.headers.get("content-type", "")
+        assert response.headers["content-length"] == "100"
+        assert response.headers["content-disposition"].startswith("inline")
 
-    def test_speak_empty_text(self):
+    def test_speak_empty_text(self, client):
         """Empty text returns 422 validation error."""
         response = client.post(
             "/speak",
@@ -150,7 +365,7 @@ class TestSpeakEndpoint:
         )
         assert response.status_code == 422
 
-    def test_speak_invalid_json(self):
+    def test_speak_invalid_json(self, client):
         """Invalid JSON body returns 422."""
         response = client.post(
             "/speak",
@@ -162,9 +377,10 @@ class TestSpeakEndpoint:
 
 # ── Replay Endpoint ─────────────────────────────────────────────────────
 
+@pytest.mark.integration
 class TestReplayEndpoint:
 
-    def test_replay_call_not_found(self):
+    def test_replay_call_not_found(self, client):
         """Non-existent call returns 404."""
         response = client.post(
             "/replay",
@@ -172,41 +388,27 @@ class TestReplayEndpoint:
         )
         assert response.status_code == 404
 
-    @patch("app.api.routes.get_tts_service")
-    def test_replay_with_coachable_segments(self, mock_tts, tmp_path):
+    def test_replay_with_coachable_segments(self, mock_tts, tmp_path, client):
         """Replay with coachable segments returns audio."""
-        # Seed test data
-        db = TestSession()
-        call = Call(call_id="test_replay_001", status="completed")
-        db.add(call)
-        db.flush()
-
-        transcript = Transcript(
-            call_id="test_replay_001",
-            full_text="Test transcript",
-        )
-        db.add(transcript)
-
-        segment = Segment(
-            call_id="test_replay_001",
-            speaker="speaker_0",
-            start_time=0.0,
-            end_time=3.0,
-            text="That's too expensive for us",
-            is_coachable=1,
-            coachable_type="objection",
-            sentiment="NEGATIVE",
-        )
-        db.add(segment)
-        db.commit()
-        db.close()
+        # Seed test data: one transaction, one INSERT per table
+        with test_engine.begin() as conn:
+            conn.execute(insert(Call).values(call_id="test_replay_001", status="completed"))
+            conn.execute(insert(Transcript).values(call_id="test_replay_001", full_text="Test transcript"))
+            conn.execute(insert(Segment).values(
+                call_id="test_replay_001",
+                speaker="speaker_0",
+                start_time=0.0,
+                end_time=3.0,
+                text="That's too expensive for us",
+                is_coachable=1,
+                coachable_type="objection",
+                sentiment="NEGATIVE",
+            ))
 
         # Mock TTS
         dummy_audio = tmp_path / "replay.mp3"
         dummy_audio.write_bytes(b"\x00" * 100)
-        mock_tts_instance = MagicMock()
-        mock_tts_instance.synthesize.return_value = str(dummy_audio)
-        mock_tts.return_value = mock_tts_instance
+        mock_tts.synthesize.return_value = str(dummy_audio)
 
         response = client.post(
             "/replay",
@@ -215,16 +417,61 @@ class TestReplayEndpoint:
 
         assert response.status_code == 200
 
-    def test_replay_no_coachable_segments(self):
+    def test_replay_no_coachable_segments(self, client):
         """Call with no coachable moments returns 404."""
-        db = TestSession()
-        call = Call(call_id="test_no_coach", status="completed")
-        db.add(call)
-        db.commit()
-        db.close()
+        with test_engine.begin() as conn:
+            conn.execute(insert(Call).values(call_id="test_no_coach", status="completed"))
 
         response = client.post(
             "/replay",
             json={"call_id": "test_no_coach"},
         )
         assert response.status_code == 404
+
+    def test_replay_query_uses_coachable_index(self):
+        """The coachable-segment lookup is an index search with no separate sort."""
+        with test_engine.connect() as conn:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT * FROM segments "
+                "WHERE call_id = 'x' AND is_coachable = 1 ORDER BY start_time"
+            ).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "ix_segments_coachable_replay" in details
+        assert "TEMP B-TREE" not in details
+
+    def test_replay_served_from_cache(self, mock_cache, mock_tts, tmp_path, client):
+        """A cached replay for a completed call skips the segment query and TTS."""
+        db = TestSession()
+        db.add(Call(call_id="test_replay_cached", status="completed"))
+        db.commit()
+        db.close()
+
+        cached_audio = tmp_path / "replay_cached.mp3"
+        cached_audio.write_bytes(b"\x00" * 50)
+        mock_cache.get.return_value = str(cached_audio)
+
+        response = client.post("/replay", json={"call_id": "test_replay_cached"})
+
+        assert response.status_code == 200
+        assert response.headers["content-length"] == "50"
+        mock_cache.get.assert_called_once_with("replay:v1:test_replay_cached")
+        mock_tts.synthesize.assert_not_called()
+
+    def test_replay_media_type_follows_file_suffix(self, mock_tts, tmp_path, client):
+        """WAV output (pyttsx3) is labelled audio/wav, not audio/mpeg."""
+        with test_engine.begin() as conn:
+            conn.execute(insert(Call).values(call_id="test_replay_wav", status="completed"))
+            conn.execute(insert(Segment).values(
+                call_id="test_replay_wav", speaker="speaker_0", start_time=0.0, end_time=1.0,
+                text="Too expensive.", is_coachable=1, coachable_type="objection",
+            ))
+
+        wav_audio = tmp_path / "replay.wav"
+        wav_audio.write_bytes(b"\x00" * 20)
+        mock_tts.synthesize.return_value = str(wav_audio)
+
+        response = client.post("/replay", json={"call_id": "test_replay_wav"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/wav"
@@ -0,0 +1,55 @@
+"""
+Unit tests for the Redis cache service.
+
+The Redis client is mocked; only the failure handling is exercised.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.cache_service import CacheService
+
+pytestmark = pytest.mark.fast
+
+
+class TestCacheService:
+    """Tests for CacheService."""
+
+    def setup_method(self):
+        self.service = CacheService()
+        self.service._enabled = True
+        self.client = MagicMock()
+        self.service._client = self.client
+
+    def test_get_hit(self):
+        """A reachable Redis returns the stored value."""
+        self.client.get.return_value = "value"
+
+        assert self.service.get("key") == "value"
+        self.client.get.assert_called_once_with("key")
+
+    def test_unreachable_redis_is_skipped_until_retry(self, monkeypatch):
+        """After a connection error, gets miss and sets are dropped without touching Redis."""
+        self.client.get.side_effect = ConnectionError("redis down")
+        monkeypatch.setattr(self.service._settings, "CACHE_RETRY_AFTER_SECONDS", 30.0)
+
+        assert self.service.get("key") is None
+        assert self.service.get("key") is None
+        self.service.set("key", "value", ttl=60)
+
+        self.client.get.assert_called_once()
+        self.client.set.assert_not_called()
+
+        # Once the window has passed Redis is tried again
+        self.service._down_until -= 30.0
+        self.client.get.side_effect = None
+        self.client.get.return_value = "value"
+        assert self.service.get("key") == "value"
+
+    def test_other_errors_do_not_skip_redis(self):
+        """An error that is not a connection failure only misses that one call."""
+        self.client.get.side_effect = [ValueError("bad reply"), "value"]
+
+        assert self.service.get("key") is None
+        assert self.service.get("key") == "value"
@@ -2,12 +2,18 @@
 Unit tests for the Sentiment Analysis service.
 """
 
-from unittest.mock import MagicMock, patch
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
 
 import pytest
 
 from app.services.sentiment_service import SentimentResult, SentimentService
 
+pytestmark = pytest.mark.fast
+
 
 class TestSentimentService:
     """Tests for SentimentService."""
@@ -15,6 +21,14 @@ class TestSentimentService:
     def setup_method(self):
         self.service = SentimentService()
 
+    def test_construction_imports_no_ml_library(self):
+        """Building the service is cheap: transformers is only imported when the model loads."""
+        before = set(sys.modules)
+        SentimentService()
+        loaded = set(sys.modules) - before
+
+        assert not loaded & {"transformers", "torch"}
+
     def test_analyze_empty_text(self):
         """Empty text returns NEUTRAL."""
         result = self.service.analyze("")
@@ -50,20 +64,62 @@ class TestSentimentService:
 
     def test_analyze_batch(self):
         """Batch analysis processes multiple texts."""
-        mock_pipeline = MagicMock()
-        mock_pipeline.return_value = [
-            {"label": "POSITIVE", "score": 0.95},
-            {"label": "NEGATIVE", "score": 0.85},
-            {"label": "POSITIVE", "score": 0.72},
-        ]
+        labels = {
+            "Great!": {"label": "POSITIVE", "score": 0.95},
+            "Terrible!": {"label": "NEGATIVE", "score": 0.85},
+            "Okay.": {"label": "POSITIVE", "score": 0.72},
+        }
+        mock_pipeline = MagicMock(side_effect=lambda texts, **_: [labels[t] for t in texts])
         self.service._pipeline = mock_pipeline
 
         texts = ["Great!", "Terrible!", "Okay."]
         results = self.service.analyze_batch(texts)
 
-        assert len(results) == 3
-        assert results[0].label == "POSITIVE"
-        assert results[1].label == "NEGATIVE"
+        # All three texts go through a single pipeline call
+        mock_pipeline.assert_called_once()
+        assert sorted(mock_pipeline.call_args.args[0]) == sorted(texts)
+        assert [r.label for r in results] == ["POSITIVE", "NEGATIVE", "POSITIVE"]
+        assert [r.score for r in results] == [0.95, 0.85, 0.72]
+
+    def test_analyze_batch_sorts_by_length(self):
+        """Texts reach the pipeline shortest-first and results keep input order."""
+        mock_pipeline = MagicMock(side_effect=lambda texts, **_: [{"label": t, "score": 1.0} for t in texts])
+        self.service._pipeline = mock_pipeline
+
+        results = self.service.analyze_batch(["medium", "longest one", "s"])
+
+        assert mock_pipeline.call_args.args[0] == ["s", "medium", "longest one"]
+        assert [r.label for r in results] == ["MEDIUM", "LONGEST ONE", "S"]
+
+    def test_analyze_batch_caches_short_texts(self):
+        """Repeated short texts run through the model once, within and across batches."""
+        mock_pipeline = MagicMock(side_effect=lambda texts, **_: [{"label": "positive", "score": 0.9} for _ in texts])
+        self.service._pipeline = mock_pipeline
+        long_text = "x" * 100
+
+        first = self.service.analyze_batch(["yeah", "okay", "yeah", long_text])
+        second = self.service.analyze_batch(["okay", "yeah", long_text])
+
+        assert mock_pipeline.call_args_list[0].args[0] == ["yeah", "okay", long_text]
+        # Only the long text is past SENTIMENT_CACHE_MAX_CHARS and re-classified
+        assert mock_pipeline.call_args_list[1].args[0] == [long_text]
+        assert len(first) == 4 and len(second) == 3
+        assert all(r.label == "POSITIVE" for r in first + second)
+
+    def test_concurrent_loads_build_one_model(self, monkeypatch):
+        """Threads racing into _load_pipeline construct the model once."""
+        loads = []
+
+        def slow_classifier(*args, **kwargs):
+            loads.append(threading.get_ident())
+            time.sleep(0.05)
+            return MagicMock()
+
+        monkeypatch.setattr("app.services.sentiment_service._SequenceClassifier", slow_classifier)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: self.service._load_pipeline(), range(4)))
+
+        assert len(loads) == 1
 
     def test_analyze_batch_empty(self):
         """Empty batch returns empty list."""
@@ -80,3 +136,25 @@ class TestSentimentService:
 
         assert result.label == "NEUTRAL"
         assert result.score == 0.0
+
+    def test_warmup_runs_one_inference(self):
+        """Warmup loads the pipeline and classifies a single input."""
+        mock_pipeline = MagicMock()
+        self.service._pipeline = mock_pipeline
+
+        self.service.warmup()
+
+        mock_pipeline.assert_called_once_with(["warmup"])
+
+    def test_submit_batches_concurrent_texts(self):
+        """Texts submitted together are classified in one pipeline call."""
+        self.service._settings = self.service._settings.model_copy(update={"SENTIMENT_BATCH_WAIT_MS": 200})
+        labels = {"Great call": "POSITIVE", "Too slow": "NEGATIVE"}
+        mock_pipeline = MagicMock(side_effect=lambda texts, **_: [{"label": labels[t], "score": 0.9} for t in texts])
+        self.service._pipeline = mock_pipeline
+
+        futures = [self.service.submit("Great call"), self.service.submit("Too slow")]
+        results = [f.result(timeout=5) for f in futures]
+
+        assert [r.label for r in results] == ["POSITIVE", "NEGATIVE"]
+        mock_pipeline.assert_called_once()
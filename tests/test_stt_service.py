@@ -4,12 +4,17 @@ Unit tests for the STT service.
 Uses mocking to avoid loading the actual Whisper model during CI.
 """
 
-from unittest.mock import MagicMock, patch
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
 
+from app.core.exceptions import AudioProcessingError
 from app.services.stt_service import STTService, TranscriptionResult, TranscriptionSegment
 
+pytestmark = pytest.mark.fast
+
 
 class TestSTTService:
     """Tests for STTService."""
@@ -17,6 +22,16 @@ class TestSTTService:
     def setup_method(self):
         """Reset singleton for each test."""
         self.service = STTService()
+        # The mocked model below returns the reference whisper result format
+        self.service._provider = "whisper"
+
+    def test_construction_imports_no_ml_library(self):
+        """Building the service is cheap: Whisper is only imported when a model loads."""
+        before = set(sys.modules)
+        STTService()
+        loaded = set(sys.modules) - before
+
+        assert not loaded & {"whisper", "faster_whisper", "ctranslate2", "torch", "numpy"}
 
     def test_assign_speakers_empty(self):
         """Empty segment list returns empty result."""
@@ -85,17 +100,32 @@ class TestSTTService:
         assert result.language == "en"
         assert len(result.segments) == 1
 
+    def test_transcribe_faster_whisper(self, temp_audio_file):
+        """faster-whisper's lazy segment generator is consumed into a result."""
+        self.service._provider = "faster_whisper"
+        raw = [
+            SimpleNamespace(start=0.0, end=2.0, text=" Hello there."),
+            SimpleNamespace(start=4.0, end=5.5, text=" Hi, thanks for calling."),
+        ]
+        mock_model = MagicMock()
+        mock_model.transcribe.return_value = (iter(raw), SimpleNamespace(language="en"))
+        self.service._model = mock_model
+
+        result = self.service.transcribe(temp_audio_file)
+
+        assert result.full_text == "Hello there. Hi, thanks for calling."
+        assert result.language == "en"
+        assert [s.speaker for s in result.segments] == ["speaker_0", "speaker_1"]
+
     def test_transcribe_file_not_found(self):
         """Non-existent file raises AudioProcessingError."""
-        from app.core.exceptions import AudioProcessingError
-
         self.service._model = MagicMock()  # skip model loading
 
         with pytest.raises(AudioProcessingError, match="not found"):
             self.service.transcribe("/nonexistent/audio.wav")
 
-    def test_transcribe_bytes(self):
-        """transcribe_bytes writes temp file and processes it."""
+    def test_transcribe_bytes(self, monkeypatch):
+        """transcribe_bytes decodes in memory and hands the array to whisper."""
         mock_model = MagicMock()
         mock_model.transcribe.return_value = {
             "text": "Test audio",
@@ -103,10 +133,46 @@ class TestSTTService:
             "segments": [{"start": 0.0, "end": 1.0, "text": "Test audio"}],
         }
         self.service._model = mock_model
+        decoded = object()
+
+        mock_decode = MagicMock(return_value=decoded)
+        monkeypatch.setattr("app.services.stt_service._decode_audio_bytes", mock_decode)
 
-        # Create minimal audio bytes
         audio_bytes = b"RIFF" + b"\x00" * 40
+        result = self.service.transcribe_bytes(audio_bytes)
+
+        mock_decode.assert_called_once_with(audio_bytes)
+        assert mock_model.transcribe.call_args.args[0] is decoded
+        assert result.full_text == "Test audio"
+
+    def test_transcribe_bytes_faster_whisper(self, monkeypatch):
+        """faster-whisper reads the bytes from a BytesIO, no temp file involved."""
+        self.service._provider = "faster_whisper"
+        mock_model = MagicMock()
+        mock_model.transcribe.return_value = (
+            iter([SimpleNamespace(start=0.0, end=1.0, text=" Test audio")]),
+            SimpleNamespace(language="en"),
+        )
+        self.service._model = mock_model
+
+        mock_tmp = MagicMock()
+        monkeypatch.setattr("tempfile.NamedTemporaryFile", mock_tmp)
 
-        # This will fail on actual Whisper but our mock doesn't care
+        audio_bytes = b"RIFF" + b"\x00" * 40
         result = self.service.transcribe_bytes(audio_bytes)
+
+        mock_tmp.assert_not_called()
+        assert mock_model.transcribe.call_args.args[0].getvalue() == audio_bytes
         assert result.full_text == "Test audio"
+
+    def test_warmup_transcribes_silence(self):
+        """Warmup runs one inference on a second of 16 kHz silence."""
+        pytest.importorskip("numpy")
+        mock_model = MagicMock()
+        self.service._model = mock_model
+
+        self.service.warmup()
+
+        audio = mock_model.transcribe.call_args.args[0]
+        assert audio.shape == (16000,)
+        assert not audio.any()
@@ -0,0 +1,234 @@
+"""
+Unit tests for the transcription pipeline in app.workers.tasks.
+
+STT and sentiment services are mocked; persistence runs against the
+in-memory SQLite session from conftest.
+"""
+
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import event
+
+from app.core.exceptions import AudioProcessingError
+from app.db.models import Call, Segment, Transcript
+from app.services.coachable_service import CoachableMoment
+from app.services.sentiment_service import SentimentResult
+from app.services.stt_service import TranscriptionSegment, TranscriptionStream
+from app.workers.tasks import ProcessingResult, process_transcription
+
+
+def _resolved(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+_SEGMENTS = [
+    TranscriptionSegment(speaker="speaker_0", start_time=0.0, end_time=1.5, text="Hello there."),
+    TranscriptionSegment(speaker="speaker_1", start_time=3.0, end_time=5.0, text="That's too expensive."),
+]
+
+
+def _stt_stream() -> TranscriptionStream:
+    return TranscriptionStream(iter(_SEGMENTS), language="en", full_text="Hello there. That's too expensive.")
+
+
+class TestProcessTranscription:
+    """Tests for process_transcription."""
+
+    def _make_call(self, db_session, call_id: str) -> None:
+        db_session.add(Call(call_id=call_id, status="queued"))
+        db_session.commit()
+
+    def test_pipeline_persists_results(self, db_session):
+        """Transcript and segments are stored and the call is completed."""
+        self._make_call(db_session, "task_001")
+
+        stt = MagicMock()
+        stt.transcribe_iter.return_value = _stt_stream()
+        sentiment = MagicMock()
+        sentiment.submit.side_effect = [
+            _resolved(SentimentResult(label="POSITIVE", score=0.9)),
+            _resolved(SentimentResult(label="NEGATIVE", score=0.8)),
+        ]
+        coachable = MagicMock()
+        coachable.detect.return_value = [
+            CoachableMoment(segment_index=1, coachable_type="objection", confidence=0.75, matched_pattern="too expensive"),
+        ]
+
+        result = process_transcription(
+            call_id="task_001",
+            audio_path="/tmp/task_001.wav",
+            db=db_session,
+            stt_service=stt,
+            sentiment_service=sentiment,
+            coachable_service=coachable,
+        )
+
+        assert isinstance(result, ProcessingResult)
+        assert result.full_text == "Hello there. That's too expensive."
+        assert [s.text for s in result.segments] == ["Hello there.", "That's too expensive."]
+        assert result.segments[1].is_coachable == 1
+        assert result.segments[1].coachable_type == "objection"
+        assert result.segments[0].sentiment == "POSITIVE"
+
+        call = db_session.query(Call).filter(Call.call_id == "task_001").one()
+        assert call.status == "completed"
+        assert db_session.query(Transcript).filter(Transcript.call_id == "task_001").count() == 1
+        assert db_session.query(Segment).filter(Segment.call_id == "task_001").count() == 2
+
+    def test_sentiment_submitted_while_streaming(self, db_session):
+        """Each segment reaches the sentiment batcher before the next is decoded."""
+        self._make_call(db_session, "task_005")
+
+        events = []
+
+        def decode():
+            for seg in _SEGMENTS:
+                events.append(f"decoded:{seg.text}")
+                yield seg
+
+        def submit(text):
+            events.append(f"submitted:{text}")
+            return _resolved(SentimentResult(label="NEUTRAL", score=0.5))
+
+        stt = MagicMock()
+        stt.transcribe_iter.return_value = TranscriptionStream(decode(), language="en")
+        sentiment = MagicMock()
+        sentiment.submit.side_effect = submit
+
+        result = process_transcription(
+            call_id="task_005",
+            audio_path="/tmp/task_005.wav",
+            db=db_session,
+            stt_service=stt,
+            sentiment_service=sentiment,
+        )
+
+        assert events == [
+            "decoded:Hello there.",
+            "submitted:Hello there.",
+            "decoded:That's too expensive.",
+            "submitted:That's too expensive.",
+        ]
+        assert result.full_text == "Hello there. That's too expensive."
+
+    def test_results_and_status_committed_once(self, db_session):
+        """Transcript, segments and the completed status share one commit."""
+        self._make_call(db_session, "task_004")
+
+        stt = MagicMock()
+        stt.transcribe_iter.return_value = _stt_stream()
+        commits = []
+
+        def listener(session):
+            commits.append(session)
+
+        event.listen(db_session, "after_commit", listener)
+        try:
+            process_transcription(
+                call_id="task_004",
+                audio_path="/tmp/task_004.wav",
+                db=db_session,
+                stt_service=stt,
+            )
+        finally:
+            event.remove(db_session, "after_commit", listener)
+
+        # One for the "processing" status, one for the results
+        assert len(commits) == 2
+
+    def test_segments_inserted_in_one_statement(self, db_session):
+        """All segment rows go out in a single batched INSERT."""
+        self._make_call(db_session, "task_006")
+
+        stt = MagicMock()
+        stt.transcribe_iter.return_value = _stt_stream()
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            result = process_transcription(
+                call_id="task_006",
+                audio_path="/tmp/task_006.wav",
+                db=db_session,
+                stt_service=stt,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert sum(s.startswith("INSERT INTO segments") for s in statements) == 1
+        assert all(s.id is not None for s in result.segments)
+        assert [s.start_time for s in result.segments] == [0.0, 3.0]
+
+    def test_sentiment_failure_is_non_fatal(self, db_session):
+        """A sentiment error still completes the call without labels."""
+        self._make_call(db_session, "task_002")
+
+        stt = MagicMock()
+        stt.transcribe_iter.return_value = _stt_stream()
+        sentiment = MagicMock()
+        failed = Future()
+        failed.set_exception(RuntimeError("model crashed"))
+        sentiment.submit.return_value = failed
+
+        result = process_transcription(
+            call_id="task_002",
+            audio_path="/tmp/task_002.wav",
+            db=db_session,
+            stt_service=stt,
+            sentiment_service=sentiment,
+        )
+
+        assert all(s.sentiment is None for s in result.segments)
+        assert db_session.query(Call).filter(Call.call_id == "task_002").one().status == "completed"
+
+    def test_stt_failure_marks_call_failed(self, db_session):
+        """STT errors propagate and mark the call as failed."""
+        self._make_call(db_session, "task_003")
+
+        stt = MagicMock()
+        stt.transcribe_iter.side_effect = AudioProcessingError("decode failed")
+
+        with pytest.raises(AudioProcessingError):
+            process_transcription(
+                call_id="task_003",
+                audio_path="/tmp/task_003.wav",
+                db=db_session,
+                stt_service=stt,
+            )
+
+        assert db_session.query(Call).filter(Call.call_id == "task_003").one().status == "failed"
+
+    def test_redelivered_task_does_not_duplicate_results(self, db_session):
+        """Running the pipeline again for a completed call keeps one copy of its results."""
+        self._make_call(db_session, "task_007")
+
+        stt = MagicMock()
+        stt.transcribe_iter.side_effect = lambda _path: _stt_stream()
+
+        first = process_transcription(
+            call_id="task_007",
+            audio_path="/tmp/task_007.wav",
+            db=db_session,
+            stt_service=stt,
+        )
+        second = process_transcription(
+            call_id="task_007",
+            audio_path="/tmp/task_007.wav",
+            db=db_session,
+            stt_service=stt,
+        )
+
+        stt.transcribe_iter.assert_called_once()
+        assert second.full_text == first.full_text
+        assert [s.id for s in second.segments] == [s.id for s in first.segments]
+        assert db_session.query(Call).filter(Call.call_id == "task_007").one().status == "completed"
+        assert db_session.query(Transcript).filter(Transcript.call_id == "task_007").count() == 1
+        assert db_session.query(Segment).filter(Segment.call_id == "task_007").count() == 2
@@ -0,0 +1,84 @@
+"""
+Unit tests for the TTS service.
+
+The provider call is mocked; only the caching behaviour is exercised.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.exceptions import TTSError
+from app.services.tts_service import TTSService
+
+
+class TestTTSService:
+    """Tests for TTSService."""
+
+    def setup_method(self):
+        self.service = TTSService()
+        self.service._cache = MagicMock()
+
+    def test_synthesize_empty_text(self):
+        """Empty text raises TTSError."""
+        with pytest.raises(TTSError):
+            self.service.synthesize("   ")
+
+    def test_cache_key_is_stable_and_versioned(self):
+        """Same text and language give the same key; language changes it."""
+        key = self.service.cache_key("Hello", "en")
+
+        assert key.startswith("tts:v1:")
+        assert key == self.service.cache_key("Hello", "en")
+        assert key != self.service.cache_key("Hello", "fr")
+
+    def test_synthesize_cached_miss(self, tmp_path):
+        """Cache miss synthesizes and stores the output path."""
+        output = tmp_path / "tts_miss.mp3"
+        output.write_bytes(b"\x00" * 10)
+        self.service._cache.get.return_value = None
+        self.service.synthesize = MagicMock(return_value=str(output))
+
+        path = self.service.synthesize_cached("Hello there", "en")
+
+        assert path == str(output)
+        self.service.synthesize.assert_called_once_with(text="Hello there", language="en")
+        key, value = self.service._cache.set.call_args.args
+        assert key == self.service.cache_key("Hello there", "en")
+        assert value == str(output)
+
+    def test_synthesize_cached_hit(self, tmp_path):
+        """Cache hit returns the stored path without synthesizing."""
+        output = tmp_path / "tts_hit.mp3"
+        output.write_bytes(b"\x00" * 10)
+        self.service._cache.get.return_value = str(output)
+        self.service.synthesize = MagicMock()
+
+        path = self.service.synthesize_cached("Hello there", "en")
+
+        assert path == str(output)
+        self.service.synthesize.assert_not_called()
+        self.service._cache.set.assert_not_called()
+
+    def test_synthesize_cached_stale_entry(self, tmp_path):
+        """A cached path whose file is gone is re-synthesized."""
+        output = tmp_path / "tts_new.mp3"
+        output.write_bytes(b"\x00" * 10)
+        self.service._cache.get.return_value = str(tmp_path / "deleted.mp3")
+        self.service.synthesize = MagicMock(return_value=str(output))
+
+        path = self.service.synthesize_cached("Hello there", "en")
+
+        assert path == str(output)
+        self.service.synthesize.assert_called_once()
+
+    def test_gtts_sentences_joined_in_order(self, tmp_path):
+        """Multi-sentence text is fetched per sentence and written in order."""
+        self.service._gtts_bytes = MagicMock(side_effect=lambda text, language: f"<{text}>".encode())
+
+        path = self.service._synthesize_gtts("First one. Second! Third?", "en", tmp_path)
+
+        assert sorted(c.args[0] for c in self.service._gtts_bytes.call_args_list) == [
+            "First one.", "Second!", "Third?",
+        ]
+        assert open(path, "rb").read() == b"<First one.><Second!><Third?>"